@@ -0,0 +1,105 @@
+import string
+
+import numpy as np
+
+from Caesar_Encryption import CaesarCodec
+from Vigenere_Cryptanalysis import ENGLISH_FREQUENCIES
+
+# Percentage of all English bigrams for the most common ones
+COMMON_BIGRAMS = {
+    'th': 3.56, 'he': 3.07, 'in': 2.43, 'er': 2.05, 'an': 1.99, 're': 1.85, 'on': 1.76,
+    'at': 1.49, 'en': 1.45, 'nd': 1.35, 'ti': 1.34, 'es': 1.34, 'or': 1.28, 'te': 1.20,
+    'of': 1.17, 'ed': 1.17, 'is': 1.13, 'it': 1.12, 'al': 1.09, 'ar': 1.07, 'st': 1.05,
+    'to': 1.04, 'nt': 1.04, 'ng': 0.95, 'se': 0.93, 'ha': 0.93, 'as': 0.87, 'ou': 0.87,
+    'io': 0.83, 'le': 0.83, 've': 0.83, 'co': 0.79, 'me': 0.79, 'de': 0.76, 'hi': 0.76,
+    'ri': 0.73, 'ro': 0.73, 'ic': 0.70, 'ne': 0.69, 'ea': 0.69, 'ra': 0.69, 'ce': 0.65,
+    'li': 0.62, 'ch': 0.60, 'll': 0.58, 'be': 0.58, 'ma': 0.57, 'si': 0.55, 'om': 0.55,
+    'ur': 0.54,
+}
+SEPARATOR = 26
+BIGRAM_CODES = 27 * 27
+BLOCK_SIZE = 4096
+
+
+def _build_tables():
+    # Byte value to letter index, with every non-letter mapped to SEPARATOR
+    letter_index = np.full(256, SEPARATOR, dtype=np.uint8)
+    for index, letter in enumerate(string.ascii_lowercase):
+        letter_index[ord(letter)] = letter_index[ord(letter.upper())] = index
+
+    # Bigram log-probabilities, pairs involving a separator score 0
+    log_probabilities = np.zeros((27, 27), dtype=np.float32)
+    log_probabilities[:26, :26] = np.log(np.outer(ENGLISH_FREQUENCIES, ENGLISH_FREQUENCIES))
+    for bigram, percentage in COMMON_BIGRAMS.items():
+        first, second = (string.ascii_lowercase.index(letter) for letter in bigram)
+        log_probabilities[first, second] = np.log(percentage / 100)
+
+    # unshift[s, c] undoes a shift of s, leaving separators alone
+    unshift = np.full((26, 27), SEPARATOR, dtype=np.intp)
+    unshift[:, :26] = (np.arange(26)[None, :] - np.arange(26)[:, None]) % 26
+
+    # Entry [code, s] scores ciphertext bigram `code` (first * 27 + second) decrypted with shift s
+    first, second = np.divmod(np.arange(BIGRAM_CODES), 27)
+    shifted_log_probabilities = log_probabilities[unshift[:, first], unshift[:, second]].T
+    return letter_index, np.ascontiguousarray(shifted_log_probabilities)
+
+
+LETTER_INDEX, SHIFTED_LOG_PROBABILITIES = _build_tables()
+
+
+def _encode_block(ciphertexts):
+    raw = [text.encode('ascii', 'replace') if isinstance(text, str) else bytes(text) for text in ciphertexts]
+    width = max(2, max(len(text) for text in raw))
+    matrix = np.array(raw, dtype=f'S{width}').view(np.uint8).reshape(len(raw), width)
+    # Padding bytes are 0, which maps to SEPARATOR like any other non-letter
+    return LETTER_INDEX[matrix]
+
+
+def score_shifts(ciphertexts, block_size=BLOCK_SIZE):
+    """
+    Score all 26 Caesar shifts of every ciphertext with English bigram statistics.
+
+    Args:
+        ciphertexts (list): Messages as str or bytes.
+        block_size (int): Messages handled per matrix operation.
+
+    Returns:
+        numpy.ndarray: A (len(ciphertexts), 26) array where entry [i, s] is the
+        bigram log-probability of message i decrypted with shift s.
+
+    Each block of messages is padded into one letter matrix and its bigrams are
+    counted per message with a single bincount. Multiplying the counts by the
+    precomputed table of log-probabilities under every shift then scores all
+    26 decryptions of the whole block in one matrix product.
+    """
+    scores = np.empty((len(ciphertexts), 26), dtype=np.float32)
+    for start in range(0, len(ciphertexts), block_size):
+        letters = _encode_block(ciphertexts[start:start + block_size]).astype(np.intp)
+        rows = len(letters)
+        bigrams = letters[:, :-1] * 27 + letters[:, 1:]
+        bigrams += np.arange(rows)[:, None] * BIGRAM_CODES
+        counts = np.bincount(bigrams.ravel(), minlength=rows * BIGRAM_CODES).reshape(rows, BIGRAM_CODES)
+        scores[start:start + rows] = counts.astype(np.float32) @ SHIFTED_LOG_PROBABILITIES
+    return scores
+
+
+def best_shifts(ciphertexts, block_size=BLOCK_SIZE):
+    """Return the most likely encryption shift for each ciphertext."""
+    return score_shifts(ciphertexts, block_size).argmax(axis=1)
+
+
+def rank_shifts(ciphertext):
+    """Return (shift, score) pairs for one ciphertext, best first."""
+    scores = score_shifts([ciphertext])[0]
+    return [(int(shift), float(scores[shift])) for shift in np.argsort(-scores, kind='stable')]
+
+
+def crack(ciphertext):
+    """
+    Brute-force a Caesar ciphertext.
+
+    Returns:
+        tuple: The most likely shift and the message decrypted with it.
+    """
+    shift = int(best_shifts([ciphertext])[0])
+    return shift, CaesarCodec(shift).decrypt(ciphertext)
@@ -1,16 +1,92 @@
+import functools
+import string
+
 text = 'Hello Zaira'
 shift = 3
 
+CHUNK_SIZE = 4 << 20
+
+
+@functools.lru_cache(maxsize=None)
+def _translation_tables(offset):
+    """
+    Build the str and bytes translation tables for a shift of `offset` letters.
+
+    Upper and lower case letters are shifted separately, every other character
+    maps to itself.
+    """
+    offset %= len(string.ascii_lowercase)
+    source = string.ascii_lowercase + string.ascii_uppercase
+    target = (string.ascii_lowercase[offset:] + string.ascii_lowercase[:offset] +
+              string.ascii_uppercase[offset:] + string.ascii_uppercase[:offset])
+    return str.maketrans(source, target), bytes.maketrans(source.encode(), target.encode())
+
+
+class CaesarCodec:
+    """
+    Caesar cipher for str, bytes and binary streams.
+
+    Args:
+        offset (int): How many letters to shift forward when encrypting.
+
+    Letters keep their case and anything that isn't an ASCII letter is passed
+    through unchanged. Each direction uses one precomputed translation table,
+    so a whole buffer is converted with a single `translate` call.
+    """
+
+    def __init__(self, offset):
+        self.offset = offset % len(string.ascii_lowercase)
+        self._encrypt_tables = _translation_tables(self.offset)
+        self._decrypt_tables = _translation_tables(-self.offset)
+
+    def encrypt(self, data):
+        return self._translate(data, self._encrypt_tables)
+
+    def decrypt(self, data):
+        return self._translate(data, self._decrypt_tables)
+
+    def encrypt_stream(self, source, destination, chunk_size=CHUNK_SIZE):
+        return self._translate_stream(source, destination, self._encrypt_tables[1], chunk_size)
+
+    def decrypt_stream(self, source, destination, chunk_size=CHUNK_SIZE):
+        return self._translate_stream(source, destination, self._decrypt_tables[1], chunk_size)
+
+    def encrypt_file(self, source_path, destination_path, chunk_size=CHUNK_SIZE):
+        with open(source_path, 'rb') as source, open(destination_path, 'wb') as destination:
+            return self.encrypt_stream(source, destination, chunk_size)
+
+    def decrypt_file(self, source_path, destination_path, chunk_size=CHUNK_SIZE):
+        with open(source_path, 'rb') as source, open(destination_path, 'wb') as destination:
+            return self.decrypt_stream(source, destination, chunk_size)
+
+    @staticmethod
+    def _translate(data, tables):
+        str_table, bytes_table = tables
+        if isinstance(data, str):
+            return data.translate(str_table)
+        if isinstance(data, memoryview):
+            return data.tobytes().translate(bytes_table)
+        return data.translate(bytes_table)
+
+    @staticmethod
+    def _translate_stream(source, destination, bytes_table, chunk_size):
+        """
+        Translate a binary stream chunk by chunk and return the bytes written.
+
+        The cipher works byte by byte, so chunk boundaries don't matter and
+        memory use is bounded by `chunk_size` whatever the size of the input.
+        """
+        total = 0
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            destination.write(chunk.translate(bytes_table))
+            total += len(chunk)
+        return total
+
+
 def caesar(message, offset):
-    alphabet = 'abcdefghijklmnopqrstuvwxyz'
-    encrypted_text = ''
-
-    for char in message.lower():
-        if char == ' ':
-            encrypted_text += char
-        else:
-            index = alphabet.find(char)
-            new_index = (index + offset) % len(alphabet)
-            encrypted_text += alphabet[new_index]
-    print('plain text:', message)
-    print('encrypted text:', encrypted_text)
\ No newline at end of file
+    return CaesarCodec(offset).encrypt(message.lower())
+
+
+if __name__ == '__main__':
+    print('plain text:', text)
+    print('encrypted text:', caesar(text, shift))
@@ -0,0 +1,134 @@
+"""
+Command line entry point for the Caesar, Vigenere and Luhn scripts.
+
+Reads the given files, or stdin, as binary chunks and writes the result to
+stdout, so it can sit in the middle of a shell pipeline:
+
+    cat log.txt | python Cipher_CLI.py caesar --shift 3 > log.enc
+    python Cipher_CLI.py vigenere --decrypt --key happycoding --mmap big.enc
+    python Cipher_CLI.py luhn --stats cards.txt > valid.txt
+
+Importing this module has no side effects, and each cipher module (and NumPy
+with it) is only imported by the subcommand that needs it.
+"""
+import argparse
+import importlib.util
+import mmap
+import os
+import sys
+import time
+
+CHUNK_SIZE = 1 << 20
+LUHN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'luhn-algorithim.py')
+
+
+def _read_chunks(file, chunk_size, use_mmap):
+    if use_mmap and file.seekable() and os.fstat(file.fileno()).st_size:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(0, len(mapped), chunk_size):
+                yield mapped[start:start + chunk_size]
+    else:
+        yield from iter(lambda: file.read(chunk_size), b'')
+
+
+def _input_chunks(paths, chunk_size, use_mmap):
+    if not paths:
+        yield from _read_chunks(sys.stdin.buffer, chunk_size, False)
+    for path in paths:
+        with open(path, 'rb') as file:
+            yield from _read_chunks(file, chunk_size, use_mmap)
+
+
+def _whole_lines(chunks):
+    # Carry a partial last line over to the next chunk
+    remainder = b''
+    for chunk in chunks:
+        chunk = remainder + chunk
+        cut = chunk.rfind(b'\n') + 1
+        remainder = chunk[cut:]
+        if cut:
+            yield chunk[:cut]
+    if remainder:
+        yield remainder
+
+
+def _caesar(args, chunks):
+    from Caesar_Encryption import CaesarCodec
+
+    codec = CaesarCodec(args.shift)
+    translate = codec.decrypt if args.decrypt else codec.encrypt
+    return (translate(chunk) for chunk in chunks)
+
+
+def _vigenere(args, chunks):
+    from Vigenere_Encryption import VigenereStream
+
+    return VigenereStream(args.key, -1 if args.decrypt else 1).stream(chunks)
+
+
+def _luhn(args, chunks):
+    spec = importlib.util.spec_from_file_location('luhn_algorithim', LUHN_PATH)
+    luhn = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(luhn)
+
+    for chunk in _whole_lines(chunks):
+        valid, invalid, _, _ = luhn.validate_records(chunk.decode(), args.csv_column)
+        yield (invalid if args.invalid else valid).encode()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Caesar, Vigenere and Luhn tools for shell pipelines.')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--mmap', action='store_true', help='memory-map input files instead of reading them')
+    common.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='bytes processed at a time')
+    common.add_argument('--stats', action='store_true', help='print throughput to stderr')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    caesar = subparsers.add_parser('caesar', parents=[common], help='Caesar cipher')
+    caesar.add_argument('-s', '--shift', type=int, required=True)
+    caesar.add_argument('-d', '--decrypt', action='store_true', help='decrypt instead of encrypt')
+    caesar.add_argument('paths', nargs='*', help='input files, stdin if none are given')
+    caesar.set_defaults(handler=_caesar)
+
+    vigenere = subparsers.add_parser('vigenere', parents=[common], help='Vigenere cipher')
+    vigenere.add_argument('-k', '--key', required=True)
+    vigenere.add_argument('-d', '--decrypt', action='store_true', help='decrypt instead of encrypt')
+    vigenere.add_argument('paths', nargs='*', help='input files, stdin if none are given')
+    vigenere.set_defaults(handler=_vigenere)
+
+    luhn = subparsers.add_parser('luhn', parents=[common], help='keep records with a valid card number')
+    luhn.add_argument('--csv-column', type=int, help='column holding the card number in CSV input')
+    luhn.add_argument('--invalid', action='store_true', help='keep the invalid records instead')
+    luhn.add_argument('paths', nargs='*', help='input files, stdin if none are given')
+    luhn.set_defaults(handler=_luhn)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'vigenere' and not (args.key.isascii() and args.key.isalpha() and args.key.islower()):
+        parser.error('argument -k/--key: must be a non-empty string of lowercase letters')
+    bytes_read = 0
+
+    def counted(chunks):
+        nonlocal bytes_read
+        for chunk in chunks:
+            bytes_read += len(chunk)
+            yield chunk
+
+    start = time.perf_counter()
+    output = sys.stdout.buffer
+    chunks = counted(_input_chunks(args.paths, args.chunk_size, args.mmap))
+    for result in args.handler(args, chunks):
+        output.write(result)
+    output.flush()
+
+    if args.stats:
+        elapsed = time.perf_counter() - start
+        rate = bytes_read / 1e6 / elapsed if elapsed else 0.0
+        print(f'{bytes_read} bytes in {elapsed:.3f} s ({rate:.1f} MB/s)', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import random
+import time
+
+from Vigenere_Encryption import custom_key, vigenere_array, vigenere_parallel
+
+
+def make_corpus(size, seed=0):
+    rng = random.Random(seed)
+    words = [''.join(rng.choices('abcdefghijklmnopqrstuvwxyz', k=rng.randint(1, 10))) for _ in range(5000)]
+    corpus = []
+    length = 0
+    while length < size:
+        line = ' '.join(rng.choices(words, k=12)) + '.\n'
+        corpus.append(line)
+        length += len(line)
+    return ''.join(corpus)[:size]
+
+
+def benchmark(size_mb, worker_counts, repeats=3):
+    """
+    Time `vigenere_parallel` for each worker count and print the throughput.
+
+    Every parallel result is checked against the single process engine, so a
+    partitioning bug shows up as an error rather than a fast number.
+    """
+    corpus = make_corpus(size_mb << 20)
+    expected = vigenere_array(corpus, custom_key)
+
+    print(f'{"workers":>8} {"seconds":>9} {"MB/s":>9} {"speedup":>8}')
+    baseline = None
+    for workers in worker_counts:
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = vigenere_parallel(corpus, custom_key, workers=workers)
+            best = min(best, time.perf_counter() - start)
+            if result != expected:
+                raise RuntimeError(f'output with {workers} workers differs from the single process output')
+        baseline = baseline or best
+        print(f'{workers:>8} {best:>9.3f} {size_mb / best:>9.1f} {baseline / best:>7.2f}x')
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description='Vigenere parallel scaling benchmark.')
+    parser.add_argument('--size', type=int, default=256, help='corpus size in MB')
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, 8, cpu_count}),
+                        help='worker counts to time')
+    parser.add_argument('--repeats', type=int, default=3, help='runs per worker count, the best is reported')
+    args = parser.parse_args()
+    benchmark(args.size, args.workers, args.repeats)
+
+
+if __name__ == '__main__':
+    main()
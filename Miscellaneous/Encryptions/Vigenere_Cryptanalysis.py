@@ -0,0 +1,134 @@
+import concurrent.futures
+
+import numpy as np
+
+from Vigenere_Encryption import decrypt
+
+# Relative frequency of each letter in English text, a-z
+ENGLISH_FREQUENCIES = np.array([
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015, 0.06094, 0.06966,
+    0.00153, 0.00772, 0.04025, 0.02406, 0.06749, 0.07507, 0.01929, 0.00095, 0.05987,
+    0.06327, 0.09056, 0.02758, 0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+])
+ENGLISH_IOC = float((ENGLISH_FREQUENCIES ** 2).sum())
+MAX_KEY_LENGTH = 20
+# SHIFTED_INDEX[s, i] is the ciphertext letter that plaintext letter i becomes with shift s
+SHIFTED_INDEX = (np.arange(26)[None, :] + np.arange(26)[:, None]) % 26
+
+
+def letter_indices(ciphertext):
+    """Return the letters of the text as a uint8 array of 0-25, dropping everything else."""
+    data = np.frombuffer(ciphertext.lower().encode('ascii', 'ignore'), dtype=np.uint8) - np.uint8(ord('a'))
+    return data[data < 26]
+
+
+def column_counts(letters, key_length):
+    """
+    Count the letters of each key column with a single bincount.
+
+    Returns:
+        numpy.ndarray: A (key_length, 26) array of letter counts.
+    """
+    columns = np.arange(len(letters)) % key_length
+    return np.bincount(columns * 26 + letters, minlength=key_length * 26).reshape(key_length, 26)
+
+
+def index_of_coincidence(counts):
+    """Index of coincidence for each row of a letter count array."""
+    totals = counts.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ioc = (counts * (counts - 1)).sum(axis=-1) / (totals * (totals - 1))
+    return np.nan_to_num(ioc)
+
+
+def kasiski_scores(letters, max_key_length=MAX_KEY_LENGTH):
+    """
+    Kasiski examination over repeated trigrams.
+
+    Returns:
+        numpy.ndarray: For each key length from 1 to `max_key_length` (index 0
+        is unused), the fraction of distances between repeated trigrams that
+        the key length divides. All zeros if nothing repeats.
+    """
+    scores = np.zeros(max_key_length + 1)
+    if len(letters) < 6:
+        return scores
+
+    letters = letters.astype(np.int64)
+    trigrams = letters[:-2] * 676 + letters[1:-1] * 26 + letters[2:]
+    order = np.argsort(trigrams, kind='stable')
+    repeated = trigrams[order[1:]] == trigrams[order[:-1]]
+    distances = (order[1:] - order[:-1])[repeated]
+    if not len(distances):
+        return scores
+
+    lengths = np.arange(1, max_key_length + 1)
+    scores[1:] = (distances[:, None] % lengths == 0).mean(axis=0)
+    return scores
+
+
+def estimate_key_length(letters, max_key_length=MAX_KEY_LENGTH):
+    """
+    Estimate the key length from the index of coincidence and Kasiski tests.
+
+    Key lengths whose average column IoC is within 10% of the best are kept,
+    which includes the real length and its multiples. If repeated trigrams were
+    found, lengths that divide fewer than half of their distances are dropped.
+    The shortest remaining length wins.
+    """
+    max_key_length = max(1, min(max_key_length, len(letters) // 2))
+    lengths = np.arange(1, max_key_length + 1)
+    ioc = np.array([index_of_coincidence(column_counts(letters, length)).mean() for length in lengths])
+
+    candidates = lengths[ioc >= 0.9 * ioc.max()]
+    kasiski = kasiski_scores(letters, max_key_length)
+    if kasiski.any():
+        confirmed = candidates[kasiski[candidates] >= 0.5]
+        if len(confirmed):
+            candidates = confirmed
+    return int(candidates[0])
+
+
+def solve_key(letters, key_length):
+    """
+    Find the key letter for each column by chi-squared scoring.
+
+    All 26 shifts of every column are scored at once against the English
+    letter frequencies, and the lowest score gives the key letter.
+    """
+    counts = column_counts(letters, key_length)
+    expected = counts.sum(axis=1)[:, None, None] * ENGLISH_FREQUENCIES
+    shifted = counts[:, SHIFTED_INDEX]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        chi_squared = np.nan_to_num(((shifted - expected) ** 2 / expected).sum(axis=-1))
+    shifts = chi_squared.argmin(axis=1)
+    return ''.join(chr(ord('a') + shift) for shift in shifts)
+
+
+def crack(ciphertext, max_key_length=MAX_KEY_LENGTH):
+    """
+    Recover the key and plaintext of a Vigenere ciphertext.
+
+    Args:
+        ciphertext (str): The encrypted English text.
+        max_key_length (int): The longest key length to consider.
+
+    Returns:
+        tuple: The recovered key and the decrypted message.
+    """
+    letters = letter_indices(ciphertext)
+    if not len(letters):
+        return '', ciphertext.lower()
+    key = solve_key(letters, estimate_key_length(letters, max_key_length))
+    return key, decrypt(ciphertext, key, workers=1)
+
+
+def crack_many(ciphertexts, max_key_length=MAX_KEY_LENGTH, workers=None, chunksize=64):
+    """
+    Crack a batch of ciphertexts in a process pool.
+
+    Returns:
+        list: A (key, plaintext) tuple for each ciphertext, in input order.
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(crack, ciphertexts, [max_key_length] * len(ciphertexts), chunksize=chunksize))
@@ -1,6 +1,14 @@
+import concurrent.futures
+import os
+
+import numpy as np
+
 text = 'mrttaqrhknsw ih puggrur'
 custom_key = 'happycoding'
 
+CHUNK_SIZE = 4 << 20
+PARALLEL_THRESHOLD = 16 << 20
+
 
 def vigenere(message, key, direction=1):
     key_index = 0
@@ -26,15 +34,179 @@ def vigenere(message, key, direction=1):
     return final_message
 
 
-def encrypt(message, key):
-    return vigenere(message, key)
+def _key_offsets(key):
+    offsets = np.frombuffer(key.encode(), dtype=np.uint8) - np.uint8(ord('a'))
+    if not key.isascii() or not len(offsets) or np.any(offsets > 25):
+        raise ValueError('key must be a non-empty string of lowercase letters')
+    return offsets
+
+
+def _key_stream(shifts, length):
+    # Tiling a longer block first makes the final tile much cheaper
+    block = np.tile(shifts, max(1, 4096 // len(shifts)))
+    return np.tile(block, -(-length // len(block)))[:length]
+
+
+def _apply_key(data, shifts, key_index=0):
+    """
+    Shift the lowercase ASCII letters of a uint8 array in place.
+
+    The key stream starts at `key_index` and only advances on letters. Returns
+    the number of letters shifted.
+    """
+    is_letter = (data - np.uint8(ord('a'))) < 26
+    letters = data[is_letter]
+    if not len(letters):
+        return 0
+
+    shifts = np.roll(shifts, -(key_index % len(shifts)))
+    letters -= np.uint8(ord('a'))
+    letters += _key_stream(shifts, len(letters))
+    # Values 26-50 wrap back by 26, for 0-25 the subtraction underflows instead
+    np.minimum(letters, letters - np.uint8(26), out=letters)
+    letters += np.uint8(ord('a'))
+    data[is_letter] = letters
+    return len(letters)
+
+
+def _direction_shifts(key, direction):
+    shifts = _key_offsets(key) if direction == 1 else (26 - _key_offsets(key)) % 26
+    return shifts.astype(np.uint8)
+
+
+def vigenere_array(message, key, direction=1):
+    """
+    Vectorized version of `vigenere` with identical output.
+
+    The lowercased message is viewed as a uint8 array and its letters are
+    gathered into one array, which gets the repeating key shifts added in one
+    pass. The letters are then put back, so every other character stays in
+    place. Messages with non-ASCII characters are handed to `vigenere` to keep
+    the results equal.
+    """
+    message = message.lower()
+    if not message.isascii():
+        return vigenere(message, key, direction)
+
+    data = np.frombuffer(message.encode('ascii'), dtype=np.uint8).copy()
+    _apply_key(data, _direction_shifts(key, direction))
+    return data.tobytes().decode('ascii')
+
+
+class VigenereStream:
+    """
+    Vigenere encryption or decryption of input that arrives in chunks.
+
+    Args:
+        key (str): The cipher key, lowercase letters only.
+        direction (int): 1 to encrypt, -1 to decrypt.
+        key_index (int): Position in the key to start from.
+        position (int): How much input has already been processed.
+
+    The key position is carried from one chunk to the next, so the output is
+    the same as processing the whole input at once. Only ASCII letters are
+    shifted; everything else, including non-ASCII text, is lowercased where
+    possible and passed through. `checkpoint` captures the state so an
+    interrupted job can continue with `from_checkpoint`.
+    """
+
+    def __init__(self, key, direction=1, key_index=0, position=0):
+        self._shifts = _direction_shifts(key, direction)
+        self.key = key
+        self.direction = direction
+        self.key_index = key_index % len(key)
+        self.position = position
+
+    def update(self, chunk):
+        """Process the next chunk, str in gives str out, bytes-like gives bytes."""
+        is_text = isinstance(chunk, str)
+        raw = chunk.lower().encode() if is_text else bytes(chunk).lower()
+        data = np.frombuffer(raw, dtype=np.uint8).copy()
+        self.key_index = (self.key_index + _apply_key(data, self._shifts, self.key_index)) % len(self.key)
+        self.position += len(chunk)
+        return data.tobytes().decode() if is_text else data.tobytes()
+
+    def stream(self, source, chunk_size=CHUNK_SIZE):
+        """
+        Generate output chunks from an iterable of chunks or a file path.
+
+        A file is opened in binary mode and read from `self.position`, so a
+        stream restored from a checkpoint picks up where the last one stopped.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            return self._stream_file(source, chunk_size)
+        return (self.update(chunk) for chunk in source)
+
+    def _stream_file(self, path, chunk_size):
+        with open(path, 'rb') as file:
+            file.seek(self.position)
+            for chunk in iter(lambda: file.read(chunk_size), b''):
+                yield self.update(chunk)
+
+    def checkpoint(self):
+        return {
+            'key': self.key,
+            'direction': self.direction,
+            'key_index': self.key_index,
+            'position': self.position,
+        }
+
+    @classmethod
+    def from_checkpoint(cls, state):
+        return cls(state['key'], state['direction'], state['key_index'], state['position'])
+
+
+def _vigenere_partition(raw, shifts, key_index):
+    data = np.frombuffer(raw, dtype=np.uint8).copy()
+    _apply_key(data, shifts, key_index)
+    return data.tobytes()
+
+
+def vigenere_parallel(message, key, direction=1, workers=None):
+    """
+    Split the message into one partition per worker and process them in parallel.
+
+    Each partition's starting key position is the number of letters before it,
+    taken from a prefix sum over the letter counts of all partitions. The
+    partitions are joined in order, so the output is identical to `vigenere`.
+    """
+    message = message.lower()
+    if not message.isascii():
+        return vigenere(message, key, direction)
+    if not message:
+        return message
+
+    workers = workers or os.cpu_count() or 1
+    raw = message.encode('ascii')
+    shifts = _direction_shifts(key, direction)
+    bounds = np.linspace(0, len(raw), workers + 1, dtype=np.int64)
+
+    is_letter = (np.frombuffer(raw, dtype=np.uint8) - np.uint8(ord('a'))) < 26
+    letter_counts = [np.count_nonzero(is_letter[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:])]
+    key_indexes = np.concatenate(([0], np.cumsum(letter_counts)[:-1])) % len(shifts)
+
+    partitions = [raw[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_vigenere_partition, partitions, [shifts] * workers, key_indexes.tolist())
+        return b''.join(results).decode('ascii')
+
+
+def _run(message, key, direction, workers):
+    if workers != 1 and len(message) >= PARALLEL_THRESHOLD:
+        return vigenere_parallel(message, key, direction, workers)
+    return vigenere_array(message, key, direction)
+
+
+def encrypt(message, key, workers=None):
+    return _run(message, key, 1, workers)
 
 
-def decrypt(message, key):
-    return vigenere(message, key, -1)
+def decrypt(message, key, workers=None):
+    return _run(message, key, -1, workers)
 
 
-print(f'\nEncrypted text: {text}')
-print(f'Key: {custom_key}')
-decryption = decrypt(text, custom_key)
-print(f'\nDecrypted text: {decryption}\n')
\ No newline at end of file
+if __name__ == '__main__':
+    print(f'\nEncrypted text: {text}')
+    print(f'Key: {custom_key}')
+    decryption = decrypt(text, custom_key)
+    print(f'\nDecrypted text: {decryption}\n')
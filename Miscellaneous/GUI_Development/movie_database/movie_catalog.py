@@ -0,0 +1,263 @@
+# movie_catalog.py
+
+import argparse
+import concurrent.futures
+import os
+import sqlite3
+import sys
+import threading
+
+# Also run on its own from the command line, so add the path unless movie_database_logic already did
+SHARED_MODULES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if SHARED_MODULES_DIR not in sys.path:
+    sys.path.append(SHARED_MODULES_DIR)
+from media_walker import walk_media
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.expanduser('~'), '.movie_database.sqlite')
+IMPORT_BATCH_SIZE = 500
+
+# Metadata keys as built by DirectoryViewerLogic.get_video_metadata, with their column types
+METADATA_COLUMNS = {
+    'filename': 'TEXT',
+    'size': 'TEXT',
+    'duration': 'REAL',
+    'overall_bitrate': 'INTEGER',
+    'video_format': 'TEXT',
+    'video_profile': 'TEXT',
+    'width': 'INTEGER',
+    'height': 'INTEGER',
+    'fps': 'REAL',
+    'bit_depth': 'INTEGER',
+    'video_bitrate': 'INTEGER',
+    'aspect_ratio': 'TEXT',
+    'audio_format': 'TEXT',
+    'audio_profile': 'TEXT',
+    'channels': 'TEXT',
+    'sample_rate': 'INTEGER',
+    'audio_bitrate': 'INTEGER',
+}
+VIDEO_KEYS = ('video_format', 'video_profile', 'width', 'height', 'fps', 'bit_depth', 'video_bitrate', 'aspect_ratio')
+AUDIO_KEYS = ('audio_format', 'audio_profile', 'channels', 'sample_rate', 'audio_bitrate')
+INDEXED_COLUMNS = (
+    ('video_format',), ('width', 'height'), ('duration',), ('video_bitrate',), ('overall_bitrate',), ('channels',),
+)
+
+
+class MovieCatalog:
+    """
+    On-disk SQLite catalog of video metadata.
+
+    Rows are keyed on the file path and remember the file's size and mtime,
+    so a stored entry is only used while the file is unchanged. The columns
+    used for filtering are indexed. The connection is shared between threads
+    behind a lock, so background workers can read and write it too.
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        columns = ', '.join(f'{name} {column_type}' for name, column_type in METADATA_COLUMNS.items())
+        with self.lock, self.connection:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS movies ("
+                f"path TEXT PRIMARY KEY, size_bytes INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, {columns})"
+            )
+            for index_columns in INDEXED_COLUMNS:
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS movies_{'_'.join(index_columns)} ON movies ({', '.join(index_columns)})"
+                )
+
+    @staticmethod
+    def _to_metadata(row):
+        metadata = {key: row[key] for key in ('filename', 'size', 'duration', 'overall_bitrate')}
+        # Keep the shape of parse_video_metadata, which leaves out missing tracks
+        if row['video_format'] is not None:
+            metadata.update({key: row[key] for key in VIDEO_KEYS})
+        if row['audio_format'] is not None:
+            metadata.update({key: row[key] for key in AUDIO_KEYS})
+            # Channels are stored as text so 2 and '5.1' share a column; give counts back as ints
+            channels = metadata['channels']
+            if channels is not None and channels.isdigit():
+                metadata['channels'] = int(channels)
+        return metadata
+
+    @staticmethod
+    def _to_row(file_path, size, mtime_ns, metadata):
+        values = [metadata.get(key) for key in METADATA_COLUMNS]
+        channels = metadata.get('channels')
+        values[list(METADATA_COLUMNS).index('channels')] = str(channels) if channels is not None else None
+        return (file_path, size, mtime_ns, *values)
+
+    def get(self, file_path):
+        """Return the stored metadata for a file, or None if it's missing or the file has changed."""
+        stat_result = os.stat(file_path)
+        with self.lock:
+            row = self.connection.execute("SELECT * FROM movies WHERE path = ?", (file_path,)).fetchone()
+        if row is None or (row['size_bytes'], row['mtime_ns']) != (stat_result.st_size, stat_result.st_mtime_ns):
+            return None
+        return self._to_metadata(row)
+
+    def store_many(self, items):
+        """Store (file_path, size, mtime_ns, metadata) tuples in one transaction."""
+        rows = [self._to_row(*item) for item in items]
+        placeholders = ', '.join('?' * (len(METADATA_COLUMNS) + 3))
+        with self.lock, self.connection:
+            self.connection.executemany(f"INSERT OR REPLACE INTO movies VALUES ({placeholders})", rows)
+
+    def store(self, file_path, metadata):
+        stat_result = os.stat(file_path)
+        self.store_many([(file_path, stat_result.st_size, stat_result.st_mtime_ns, metadata)])
+
+    def remove(self, file_path):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM movies WHERE path = ?", (file_path,))
+
+    def find(self, video_format=None, min_width=None, min_height=None, min_duration=None, max_duration=None,
+             min_bitrate=None, max_bitrate=None, channels=None, limit=None):
+        """
+        Query the catalog using its indexes.
+
+        Any combination of filters can be given. Durations are in seconds and
+        bitrates are video bitrates in bits per second. Channels match the
+        stored value, e.g. 2 or '5.1'.
+
+        Returns:
+            list: Metadata dicts, with an added 'path' key.
+        """
+        conditions = []
+        parameters = []
+        for clause, value in (
+            ("video_format = ?", video_format),
+            ("width >= ?", min_width),
+            ("height >= ?", min_height),
+            ("duration >= ?", min_duration),
+            ("duration <= ?", max_duration),
+            ("video_bitrate >= ?", min_bitrate),
+            ("video_bitrate <= ?", max_bitrate),
+            ("channels = ?", str(channels) if channels is not None else None),
+        ):
+            if value is not None:
+                conditions.append(clause)
+                parameters.append(value)
+
+        query = "SELECT * FROM movies"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY path"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        with self.lock:
+            rows = self.connection.execute(query, parameters).fetchall()
+        return [{'path': row['path'], **self._to_metadata(row)} for row in rows]
+
+    def import_library(self, directory, parse, workers=4, recursive=True):
+        """
+        Fill the catalog with every video file under a directory.
+
+        Args:
+            directory (str): The library root.
+            parse (callable): Builds the metadata dict for a file path, e.g.
+                DirectoryViewerLogic.parse_video_metadata.
+            workers (int): Number of files parsed at the same time.
+            recursive (bool): Include subdirectories, or only the files
+                directly inside the directory.
+
+        Files already stored with the same size and mtime are skipped. Results
+        are written in batches, and catalog entries under the directory whose
+        files no longer exist are removed.
+
+        Returns:
+            tuple: The number of files parsed and the number skipped.
+        """
+        directory = os.path.abspath(directory)
+        prefix = os.path.join(directory, '')
+        query = "SELECT path, size_bytes, mtime_ns FROM movies WHERE substr(path, 1, ?) = ?"
+        parameters = [len(prefix), prefix]
+        if not recursive:
+            query += " AND instr(substr(path, ?), ?) = 0"
+            parameters += [len(prefix) + 1, os.sep]
+        with self.lock:
+            known = {
+                row['path']: (row['size_bytes'], row['mtime_ns'])
+                for row in self.connection.execute(query, parameters)
+            }
+
+        parsed = skipped = 0
+        batch = []
+        seen = set()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            for entry in walk_media(directory, recursive=recursive):
+                seen.add(entry.path)
+                if known.get(entry.path) == (entry.size, entry.mtime_ns):
+                    skipped += 1
+                    continue
+                if len(pending) >= workers * 4:
+                    done = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED).done
+                    parsed += self._collect(done, pending, batch)
+                pending[executor.submit(parse, entry.path)] = entry
+            parsed += self._collect(concurrent.futures.wait(pending).done, pending, batch)
+        self.store_many(batch)
+
+        with self.lock, self.connection:
+            self.connection.executemany("DELETE FROM movies WHERE path = ?", [(path,) for path in known.keys() - seen])
+        return parsed, skipped
+
+    def _collect(self, done, pending, batch):
+        parsed = 0
+        for future in done:
+            entry = pending.pop(future)
+            metadata = future.result()
+            if metadata:
+                batch.append((entry.path, entry.size, entry.mtime_ns, metadata))
+                parsed += 1
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            self.store_many(batch)
+            batch.clear()
+        return parsed
+
+    def close(self):
+        self.connection.close()
+
+
+def main():
+    from movie_database_logic import DirectoryViewerLogic
+
+    parser = argparse.ArgumentParser(description='Build or query the movie metadata catalog.')
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG_PATH, help='catalog database file')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='add every video under a directory to the catalog')
+    import_parser.add_argument('directory')
+    import_parser.add_argument('-j', '--workers', type=int, default=4)
+
+    query_parser = subparsers.add_parser('query', help='list catalog entries matching the filters')
+    query_parser.add_argument('--codec', dest='video_format')
+    query_parser.add_argument('--min-width', type=int)
+    query_parser.add_argument('--min-height', type=int)
+    query_parser.add_argument('--min-duration', type=float, help='seconds')
+    query_parser.add_argument('--max-duration', type=float, help='seconds')
+    query_parser.add_argument('--min-bitrate', type=int, help='video bits per second')
+    query_parser.add_argument('--max-bitrate', type=int, help='video bits per second')
+    query_parser.add_argument('--channels')
+    query_parser.add_argument('--limit', type=int)
+    args = parser.parse_args()
+
+    catalog = MovieCatalog(args.catalog)
+    if args.command == 'import':
+        logic = DirectoryViewerLogic(catalog=catalog)
+        parsed, skipped = catalog.import_library(args.directory, logic.parse_video_metadata, args.workers)
+        print(f"Imported {parsed} files, {skipped} unchanged")
+    else:
+        filters = {key: value for key, value in vars(args).items() if key not in ('catalog', 'command')}
+        for metadata in catalog.find(**filters):
+            print(f"{metadata['path']}  {metadata.get('width')}x{metadata.get('height')}  "
+                  f"{metadata.get('video_format')}  {metadata.get('channels')}")
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,91 @@
 import os
 import sys
 
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QObject, QPersistentModelIndex, QRunnable, QThreadPool, QTimer, pyqtSignal
 from PyQt6.QtGui import QIcon, QPixmap, QAction, QFileSystemModel
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QMenuBar, QTreeView, QFileDialog,
     QComboBox, QLabel, QHBoxLayout, QVBoxLayout, QPushButton, QGroupBox, QSplitter
 )
 
-from movie_database_logic import DirectoryViewerLogic
+from movie_database_logic import DirectoryViewerLogic, has_extension
+from movie_library_watcher import LibraryWatcher, TaskWorker, list_directories
+
+SELECTION_DELAY_MS = 50
+PREFETCH_NEIGHBOURS = 3
+PREFETCH_PRIORITY = -1
+
+
+class MetadataWorkerSignals(QObject):
+    finished = pyqtSignal(int, str, object)
+
+
+class MetadataWorker(QRunnable):
+    """
+    Loads the metadata of a selected file or directory off the main thread.
+
+    The result is emitted with the id of the request that started it, so the
+    window can drop results for selections the user has already moved past.
+    A worker whose request is superseded before it starts does no work.
+    """
+
+    def __init__(self, request_id, path, logic, is_current):
+        super().__init__()
+        self.request_id = request_id
+        self.path = path
+        self.logic = logic
+        self.is_current = is_current
+        self.signals = MetadataWorkerSignals()
+
+    def run(self):
+        if not self.is_current(self.request_id):
+            return
+        if os.path.isfile(self.path):
+            if has_extension(self.path):
+                result = {'metadata': self.logic.get_video_metadata(self.path)}
+            else:
+                try:
+                    result = {'size': os.path.getsize(self.path)}
+                except OSError:
+                    result = {'size': None}
+        else:
+            result = {'directory': self.logic.get_directory_info(self.path)}
+        self.signals.finished.emit(self.request_id, self.path, result)
+
+
+class PrefetchWorker(QRunnable):
+    """Warms the metadata cache for a file next to the current selection."""
+
+    def __init__(self, request_id, path, logic, is_current):
+        super().__init__()
+        self.request_id = request_id
+        self.path = path
+        self.logic = logic
+        self.is_current = is_current
+
+    def run(self):
+        if self.is_current(self.request_id):
+            self.logic.get_video_metadata(self.path)
 
 
 class DirectoryViewerGUI(QMainWindow):
     def __init__(self):
         super().__init__()
         self.logic = DirectoryViewerLogic()
+        self.thread_pool = QThreadPool()
+        # Library syncs run one at a time, apart from the selection workers so clearing those never drops a sync
+        self.sync_pool = QThreadPool()
+        self.sync_pool.setMaxThreadCount(1)
+        self.watcher = LibraryWatcher(self, thread_pool=self.sync_pool)
+        self.watcher.changed.connect(self.on_library_changed)
+        self.request_id = 0
+        self.pending_path = None
+        self.pending_index = None
+        # Wait for the selection to settle so fast arrow-key navigation doesn't queue up work
+        self.selection_timer = QTimer(self)
+        self.selection_timer.setSingleShot(True)
+        self.selection_timer.setInterval(SELECTION_DELAY_MS)
+        self.selection_timer.timeout.connect(self.start_metadata_worker)
         self.init_ui()
         self.setup_main_window()
 
@@ -175,6 +246,7 @@ class DirectoryViewerGUI(QMainWindow):
             self.update_tree_view(dir_path)
 
     def update_tree_view(self, dir_path):
+        self.watch_library(dir_path)
         self.model.setRootPath(dir_path)
         self.treeview.setRootIndex(self.model.index(dir_path))
 
@@ -199,12 +271,86 @@ class DirectoryViewerGUI(QMainWindow):
         indexes = selected.indexes()
         if indexes:
             file_path = self.model.filePath(indexes[0])
-            if os.path.isfile(file_path):
-                self.update_file_metadata(file_path)
-                self.show_file_metadata()
-            else:
-                self.update_directory_metadata(file_path)
+            # Supersede any earlier request: queued workers are dropped, running ones are ignored
+            self.request_id += 1
+            self.thread_pool.clear()
+            self.pending_path = file_path
+            self.pending_index = QPersistentModelIndex(indexes[0])
+            if self.model.isDir(indexes[0]):
+                self.show_loading(self.dir_labels)
                 self.show_directory_metadata()
+            else:
+                self.show_loading(self.file_labels, self.video_labels, self.audio_labels)
+                self.show_file_metadata()
+            self.selection_timer.start()
+
+    def watch_library(self, dir_path):
+        self.watcher.watch(dir_path)
+        # Listing every subdirectory of a large library is left to the sync pool
+        self.start_sync_task(lambda dir_paths: self.on_directories_listed(dir_path, dir_paths),
+                             list_directories, dir_path)
+
+    def on_directories_listed(self, root, dir_paths):
+        # Drop the listing if another library was opened while it ran
+        if root == self.watcher.root:
+            self.watcher.add_paths(dir_paths)
+
+    def on_library_changed(self, dir_paths):
+        root = self.watcher.root
+        self.start_sync_task(lambda new_dirs: self.on_library_synced(root, dir_paths, new_dirs),
+                             self.logic.sync_directories, dir_paths, frozenset(self.watcher.watched))
+
+    def on_library_synced(self, root, dir_paths, new_dirs):
+        if root != self.watcher.root:
+            return
+        self.watcher.add_paths(new_dirs)
+        if self.pending_path and (self.pending_path in dir_paths or os.path.dirname(self.pending_path) in dir_paths):
+            # The selection itself changed, load it again
+            self.request_id += 1
+            self.selection_timer.start()
+
+    def start_sync_task(self, callback, function, *args):
+        worker = TaskWorker(function, *args)
+        worker.signals.finished.connect(callback)
+        self.sync_pool.start(worker)
+
+    def is_current_request(self, request_id):
+        return request_id == self.request_id
+
+    def start_metadata_worker(self):
+        worker = MetadataWorker(self.request_id, self.pending_path, self.logic, self.is_current_request)
+        worker.signals.finished.connect(self.on_metadata_loaded)
+        self.thread_pool.start(worker)
+        if self.pending_index.isValid() and not self.model.isDir(self.pending_index):
+            self.prefetch_neighbours(self.pending_index)
+
+    def prefetch_neighbours(self, index):
+        # Nearest siblings first, both directions, behind the selection's own worker
+        parent = index.parent()
+        for distance in range(1, PREFETCH_NEIGHBOURS + 1):
+            for row in (index.row() + distance, index.row() - distance):
+                sibling = self.model.index(row, 0, parent)
+                if not sibling.isValid() or self.model.isDir(sibling):
+                    continue
+                path = self.model.filePath(sibling)
+                if has_extension(path):
+                    worker = PrefetchWorker(self.request_id, path, self.logic, self.is_current_request)
+                    self.thread_pool.start(worker, PREFETCH_PRIORITY)
+
+    def on_metadata_loaded(self, request_id, path, result):
+        if not self.is_current_request(request_id):
+            return
+        if 'directory' in result:
+            self.update_directory_metadata(result['directory'])
+            self.show_directory_metadata()
+        else:
+            self.update_file_metadata(path, result)
+            self.show_file_metadata()
+
+    def show_loading(self, *label_dicts):
+        for label_dict in label_dicts:
+            for label in label_dict.values():
+                label.setText('Loading...')
 
     def show_file_metadata(self):
         self.f_groupbox.show()
@@ -218,8 +364,7 @@ class DirectoryViewerGUI(QMainWindow):
         self.a_groupbox.hide()
         self.dir_groupbox.show()
 
-    def update_directory_metadata(self, dir_path):
-        dir_info = self.logic.get_directory_info(dir_path)
+    def update_directory_metadata(self, dir_info):
         if dir_info:
             self.dir_labels['Name'].setText(dir_info['name'])
             self.dir_labels['Size'].setText(dir_info['size'])
@@ -231,10 +376,9 @@ class DirectoryViewerGUI(QMainWindow):
             for label in self.dir_labels.values():
                 label.setText("N/A")
 
-    def update_file_metadata(self, file_path):
-        _, ext = os.path.splitext(file_path)
-        if ext.lower() in ['.mkv', '.avi', '.mp4', '.mov', '.flv']:
-            metadata = self.logic.get_video_metadata(file_path)
+    def update_file_metadata(self, file_path, result):
+        if 'metadata' in result:
+            metadata = result['metadata']
             if metadata:
                 # Update file metadata
                 self.file_labels['Name'].setText(metadata['filename'])
@@ -277,7 +421,8 @@ class DirectoryViewerGUI(QMainWindow):
         else:
             self.clear_all_labels()
             self.file_labels['Name'].setText(os.path.basename(file_path))
-            self.file_labels['Size'].setText(self.logic.format_size(os.path.getsize(file_path)))
+            size = result.get('size')
+            self.file_labels['Size'].setText(self.logic.format_size(size) if size is not None else "N/A")
             self.file_labels['Duration'].setText("N/A")
             self.file_labels['Overall Bitrate'].setText("N/A")
             self.clear_labels(self.video_labels)
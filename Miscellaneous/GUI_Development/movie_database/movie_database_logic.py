@@ -1,15 +1,167 @@
 # movie_database_logic.py
 
 import os
+import sys
+import threading
 import time
+from collections import OrderedDict
 
 from pymediainfo import MediaInfo
 from fractions import Fraction
 
+# media_walker.py is shared with video_audio_info.py, two directories up. This module is imported first
+# by the GUI, so the catalog and the library watcher find it through the path added here.
+SHARED_MODULES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if SHARED_MODULES_DIR not in sys.path:
+    sys.path.append(SHARED_MODULES_DIR)
+from media_walker import has_extension, walk
+from movie_catalog import MovieCatalog
+
+METADATA_CACHE_BYTES = 8 << 20
+
+
+class DirectorySizeCache:
+    """
+    Per-directory size, file and subdirectory counts, rolled up to parents.
+
+    Each directory keeps its own aggregates and the list of its children,
+    along with its mtime when it was scanned. A later lookup only re-stats the
+    directories of the subtree and rescans those whose mtime changed, which
+    happens whenever an entry is added, removed or renamed in them. Changes to
+    the size of an existing file don't touch the mtime of its directory; call
+    `invalidate` for those. Lookups and invalidations may come from the GUI's
+    background workers, so they are serialized by a lock.
+    """
 
-class DirectoryViewerLogic:
     def __init__(self):
+        self.entries = {}
+        self.lock = threading.RLock()
+
+    def _scan(self, dir_path, mtime_ns):
+        # Same walker, and so the same handling of symlinks and unreadable entries, as a full walk
+        size = files = subdirs = 0
+        children = []
+        for entry in walk(dir_path, extensions=None, include_dirs=True, recursive=False):
+            if entry.is_dir:
+                subdirs += 1
+                children.append(entry.path)
+            else:
+                files += 1
+                size += entry.size
+        return {'mtime_ns': mtime_ns, 'size': size, 'files': files, 'subdirs': subdirs, 'children': children}
+
+    def _refresh(self, dir_path):
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+            cached = self.entries.get(dir_path)
+            if cached and cached['mtime_ns'] == mtime_ns:
+                return cached
+            entry = self._scan(dir_path, mtime_ns)
+            if cached:
+                # The mtime only covers this directory's own entries; keep the subdirectories that are still there
+                for child in set(cached['children']) - set(entry['children']):
+                    self.invalidate(child, recursive=True)
+            self.entries[dir_path] = entry
+            return entry
+        except OSError:
+            self.invalidate(dir_path, recursive=True)
+            return None
+
+    def invalidate(self, dir_path, recursive=False):
+        with self.lock:
+            cached = self.entries.pop(dir_path, None)
+            if cached and recursive:
+                for child in cached['children']:
+                    self.invalidate(child, recursive=True)
+
+    def totals(self, dir_path):
+        """Return the total size, file count and subdirectory count under a directory."""
+        with self.lock:
+            return self._totals(dir_path)
+
+    def _totals(self, dir_path):
+        # Refresh the subtree top-down, then roll the totals up bottom-up
+        visited = []
+        stack = [dir_path]
+        while stack:
+            cached = self._refresh(stack.pop())
+            if cached:
+                visited.append(cached)
+                stack.extend(cached['children'])
+
+        for cached in reversed(visited):
+            size, files, subdirs = cached['size'], cached['files'], cached['subdirs']
+            for child in cached['children']:
+                child_totals = self.entries.get(child, {}).get('totals')
+                if child_totals:
+                    size += child_totals[0]
+                    files += child_totals[1]
+                    subdirs += child_totals[2]
+            cached['totals'] = (size, files, subdirs)
+        if not visited:
+            raise FileNotFoundError(dir_path)
+        return visited[0]['totals']
+
+
+class MetadataCache:
+    """
+    In-memory LRU cache of parsed video metadata, bounded by size in bytes.
+
+    Entries remember the file's size and mtime and are only returned while
+    the file is unchanged. The size of an entry is estimated from the dict
+    and its keys and values, and the least recently used entries are evicted
+    once the total goes over `max_bytes`.
+    """
+
+    def __init__(self, max_bytes=METADATA_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _estimate_size(metadata):
+        return sys.getsizeof(metadata) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in metadata.items())
+
+    def get(self, file_path, stat_result):
+        with self.lock:
+            cached = self.entries.get(file_path)
+            if cached is None:
+                return None
+            if cached[0] != (stat_result.st_size, stat_result.st_mtime_ns):
+                self._remove(file_path)
+                return None
+            self.entries.move_to_end(file_path)
+            return cached[1]
+
+    def put(self, file_path, stat_result, metadata):
+        size = self._estimate_size(metadata)
+        with self.lock:
+            self._remove(file_path)
+            self.entries[file_path] = ((stat_result.st_size, stat_result.st_mtime_ns), metadata, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                self.total_bytes -= self.entries.popitem(last=False)[1][2]
+
+    def _remove(self, file_path):
+        cached = self.entries.pop(file_path, None)
+        if cached is not None:
+            self.total_bytes -= cached[2]
+
+    def remove(self, file_path):
+        with self.lock:
+            self._remove(file_path)
+
+
+class DirectoryViewerLogic:
+    def __init__(self, catalog=None):
         self.recent_dirs = []
+        self.size_cache = DirectorySizeCache()
+        self.metadata_cache = MetadataCache()
+        self.catalog = catalog if catalog is not None else MovieCatalog()
+        # A lock and waiter count per file being loaded, so a prefetch and a selection never parse the same file twice
+        self.loading = {}
+        self.loading_lock = threading.Lock()
 
     def update_recent_dirs(self, dir_path):
         if dir_path not in self.recent_dirs:
@@ -20,15 +172,7 @@ class DirectoryViewerLogic:
     def get_directory_info(self, dir_path):
         try:
             stat_info = os.stat(dir_path)
-            total_size = 0
-            file_count = 0
-            subdir_count = 0
-            for root, dirs, files in os.walk(dir_path):
-                subdir_count += len(dirs)
-                file_count += len(files)
-                for f in files:
-                    fp = os.path.join(root, f)
-                    total_size += os.path.getsize(fp)
+            total_size, file_count, subdir_count = self.size_cache.totals(dir_path)
             return {
                 'name': os.path.basename(dir_path),
                 'created': time.ctime(stat_info.st_ctime),
@@ -50,6 +194,87 @@ class DirectoryViewerLogic:
             return f"{size / 1e3:.2f} KB"
 
     def get_video_metadata(self, file_path):
+        try:
+            stat_result = os.stat(file_path)
+        except OSError as e:
+            print(f"Error reading {file_path}: {str(e)}")
+            return None
+        metadata = self.metadata_cache.get(file_path, stat_result)
+        if metadata is not None:
+            return metadata
+
+        with self.loading_lock:
+            loading = self.loading.setdefault(file_path, [threading.Lock(), 0])
+            loading[1] += 1
+        try:
+            with loading[0]:
+                # Another thread may have loaded it while we waited
+                metadata = self.metadata_cache.get(file_path, stat_result)
+                if metadata is None:
+                    metadata = self.load_video_metadata(file_path)
+                    if metadata:
+                        self.metadata_cache.put(file_path, stat_result, metadata)
+        finally:
+            with self.loading_lock:
+                loading[1] -= 1
+                if not loading[1]:
+                    del self.loading[file_path]
+        return metadata
+
+    def load_video_metadata(self, file_path):
+        try:
+            metadata = self.catalog.get(file_path)
+        except Exception as e:
+            print(f"Error reading catalog entry for {file_path}: {str(e)}")
+            metadata = None
+        if metadata is None:
+            metadata = self.parse_video_metadata(file_path)
+            if metadata:
+                try:
+                    self.catalog.store(file_path, metadata)
+                except Exception as e:
+                    print(f"Error storing catalog entry for {file_path}: {str(e)}")
+        return metadata
+
+    def import_library(self, dir_path, workers=4):
+        return self.catalog.import_library(dir_path, self.parse_video_metadata, workers)
+
+    def sync_directories(self, dir_paths, known_dirs=frozenset(), workers=4):
+        """
+        Bring the caches up to date after the given directories changed.
+
+        Args:
+            dir_paths (iterable): Directories whose entries were added,
+                removed, renamed or modified.
+            known_dirs (set): Directories already being watched.
+            workers (int): Number of files parsed at the same time.
+
+        Only the files directly inside each changed directory are re-checked
+        against the catalog, and only its own size aggregate is dropped; the
+        parents' totals are rolled up again from the cache on the next lookup.
+        Subdirectories missing from `known_dirs` are new, so their whole tree
+        is imported.
+
+        Returns:
+            list: The new directories, including everything below them.
+        """
+        new_dirs = []
+        for dir_path in dir_paths:
+            if not os.path.isdir(dir_path):
+                # Removed or renamed away: drop everything that was under it
+                self.size_cache.invalidate(dir_path, recursive=True)
+                self.catalog.import_library(dir_path, self.parse_video_metadata, workers)
+                continue
+            self.size_cache.invalidate(dir_path)
+            self.catalog.import_library(dir_path, self.parse_video_metadata, workers, recursive=False)
+            for entry in walk(dir_path, extensions=(), include_dirs=True, recursive=False):
+                if entry.path not in known_dirs:
+                    self.catalog.import_library(entry.path, self.parse_video_metadata, workers)
+                    new_dirs.append(entry.path)
+                    new_dirs.extend(subdir.path for subdir in walk(entry.path, extensions=(), include_dirs=True))
+        return new_dirs
+
+    def parse_video_metadata(self, file_path):
         try:
             media_info = MediaInfo.parse(file_path)
 
@@ -0,0 +1,175 @@
+# movie_library_watcher.py
+
+import os
+import time
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+# On the path added by movie_database_logic
+from media_walker import walk
+
+DEBOUNCE_MS = 500
+MAX_DELAY_MS = 5000
+POLL_INTERVAL_MS = 2000
+
+
+def list_directories(root):
+    """Return a directory and every directory below it."""
+    return [root] + [entry.path for entry in walk(root, extensions=(), include_dirs=True)]
+
+
+def changed_mtimes(mtimes):
+    """Return {path: current mtime_ns or None} for the directories whose mtime differs from `mtimes`."""
+    changed = {}
+    for path, mtime_ns in mtimes.items():
+        try:
+            current = os.stat(path).st_mtime_ns
+        except OSError:
+            current = None
+        if current != mtime_ns:
+            changed[path] = current
+    return changed
+
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class TaskWorker(QRunnable):
+    """
+    Runs a function on a thread pool and emits its return value.
+
+    An exception, e.g. "database is locked" from the catalog, is printed and
+    emitted through `failed` rather than left to escape the pool thread.
+    """
+
+    def __init__(self, function, *args):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.function(*self.args)
+        except Exception as e:
+            print(f"Error in background task {getattr(self.function, '__name__', self.function)}: {str(e)}")
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+
+class LibraryWatcher(QObject):
+    """
+    Watches every directory of a library and reports changes in batches.
+
+    Directories are watched with QFileSystemWatcher (inotify on Linux), which
+    only reports that something inside a directory changed. Directories it
+    can't watch, e.g. once the inotify watch limit is reached, and all of them
+    when `use_polling` is set (network shares don't send change events), are
+    polled for a changed mtime instead. The stat calls run on `thread_pool`,
+    since polling thousands of directories on a network share would freeze
+    the window, and only the changed paths come back to the GUI thread.
+
+    Events are collected until none has arrived for `debounce_ms`, or at most
+    `max_delay_ms` after the first one, and then `changed` is emitted once
+    with all the directories involved. Copying a thousand files into a folder
+    therefore leads to one or a few updates rather than a thousand.
+    """
+
+    changed = pyqtSignal(list)
+
+    def __init__(self, parent=None, debounce_ms=DEBOUNCE_MS, max_delay_ms=MAX_DELAY_MS,
+                 poll_interval_ms=POLL_INTERVAL_MS, use_polling=False, thread_pool=None):
+        super().__init__(parent)
+        self.debounce_ms = debounce_ms
+        self.max_delay_ms = max_delay_ms
+        self.use_polling = use_polling
+        self.thread_pool = thread_pool if thread_pool is not None else QThreadPool.globalInstance()
+        self.polling = False
+        self.root = None
+        self.watched = set()
+        self.polled = {}
+        self.pending = set()
+        self.first_event = None
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.timeout.connect(self.flush)
+
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(poll_interval_ms)
+        self.poll_timer.timeout.connect(self.poll)
+
+    def watch(self, root):
+        """Stop watching the previous library and start watching `root` itself."""
+        self.clear()
+        self.root = root
+        self.add_paths([root])
+
+    def add_paths(self, dir_paths):
+        dir_paths = [path for path in dir_paths if path not in self.watched]
+        if not dir_paths:
+            return
+        self.watched.update(dir_paths)
+        failed = dir_paths if self.use_polling else self.watcher.addPaths(dir_paths)
+        for path in failed:
+            try:
+                self.polled[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                self.watched.discard(path)
+        if self.polled and not self.poll_timer.isActive():
+            self.poll_timer.start()
+
+    def clear(self):
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.root = None
+        self.watched.clear()
+        self.polled.clear()
+        self.pending.clear()
+        self.poll_timer.stop()
+        self.debounce_timer.stop()
+
+    def poll(self):
+        # Skip a tick while the previous poll is still running
+        if self.polling:
+            return
+        self.polling = True
+        mtimes = dict(self.polled)
+        worker = TaskWorker(changed_mtimes, mtimes)
+        worker.signals.finished.connect(lambda changed: self.on_polled(mtimes, changed))
+        worker.signals.failed.connect(lambda error: self.on_polled(mtimes, {}))
+        self.thread_pool.start(worker)
+
+    def on_polled(self, mtimes, changed):
+        self.polling = False
+        for path, current in changed.items():
+            # Ignore directories that were unwatched, or updated, while the poll ran
+            if path in self.polled and self.polled[path] == mtimes[path]:
+                self.polled[path] = current
+                self.on_directory_changed(path)
+
+    def on_directory_changed(self, path):
+        if not self.pending:
+            self.first_event = time.monotonic()
+        self.pending.add(path)
+        waited_ms = (time.monotonic() - self.first_event) * 1000
+        self.debounce_timer.start(max(0, min(self.debounce_ms, int(self.max_delay_ms - waited_ms))))
+
+    def flush(self):
+        dir_paths = sorted(self.pending)
+        self.pending.clear()
+        # Forget directories that are gone; QFileSystemWatcher drops those on its own
+        for path in dir_paths:
+            if not os.path.isdir(path):
+                prefix = os.path.join(path, '')
+                for removed in [p for p in self.watched if p == path or p.startswith(prefix)]:
+                    self.watched.discard(removed)
+                    self.polled.pop(removed, None)
+        if dir_paths:
+            self.changed.emit(dir_paths)
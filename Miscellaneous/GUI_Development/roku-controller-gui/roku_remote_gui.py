@@ -8,12 +8,17 @@ from PyQt6.QtCore import QThread, pyqtSignal
 from roku_remote_logic import RokuController
 
 class ScanThread(QThread):
+    device_found = pyqtSignal(dict)
     finished = pyqtSignal(list)
 
+    def __init__(self, controller, full_scan=False):
+        super().__init__()
+        self.controller = controller
+        self.full_scan = full_scan
+
     def run(self):
-        controller = RokuController()
-        controller.scan_network()
-        self.finished.emit(controller.devices)
+        devices = self.controller.refresh_devices(self.full_scan, on_device=self.device_found.emit)
+        self.finished.emit(devices)
 
 class RokuControllerGUI(QMainWindow):
     def __init__(self):
@@ -22,7 +27,7 @@ class RokuControllerGUI(QMainWindow):
         self.current_device = None
         self.initialize_ui()
         self.setup_main_window()
-        self.start_scan()
+        self.load_cached_devices()
 
     def initialize_ui(self):
         self.setWindowTitle('Roku Controller')
@@ -37,7 +42,7 @@ class RokuControllerGUI(QMainWindow):
         self.device_combo = QComboBox()
         self.device_combo.setPlaceholderText("Select Roku Device")
         self.scan_button = QPushButton("Scan for Devices")
-        self.scan_button.clicked.connect(self.start_scan)
+        self.scan_button.clicked.connect(lambda: self.start_scan(full_scan=True))
 
         device_layout.addWidget(self.device_combo, 0, 1, 1, 1)
         device_layout.addWidget(self.scan_button, 0, 2, 1, 1)
@@ -109,27 +114,53 @@ class RokuControllerGUI(QMainWindow):
         self.minimize_action.setStatusTip("Minimize the application")
         self.minimize_action.triggered.connect(self.showMinimized)
 
-    def start_scan(self):
+    def load_cached_devices(self):
+        # Show the devices from the last run right away, then check them in the background
+        devices = self.roku_controller.cached_devices()
+        if devices:
+            self.show_devices(devices)
+            self.display_window.append(f"Loaded {len(devices)} known Roku device(s), checking them...")
+        self.start_scan(full_scan=False)
+
+    def start_scan(self, full_scan=True):
         self.scan_button.setEnabled(False)
         self.scan_button.setText("Scanning...")
-        self.scan_thread = ScanThread()
+        self.scan_thread = ScanThread(self.roku_controller, full_scan)
+        self.scan_thread.device_found.connect(self.device_found)
         self.scan_thread.finished.connect(self.scan_finished)
         self.scan_thread.start()
-        self.display_window.append("Scanning for Roku devices...")
+        if full_scan or not self.roku_controller.devices:
+            self.display_window.append("Scanning for Roku devices...")
+
+    def device_found(self, device):
+        # Make devices usable as they answer, without waiting for the whole scan
+        if all(known['ip'] != device['ip'] for known in self.roku_controller.devices):
+            if not self.roku_controller.devices:
+                self.device_combo.clear()
+            self.roku_controller.devices.append(device)
+            self.device_combo.addItem(f"{device['name']} ({device['ip']})")
 
-    def scan_finished(self, devices):
+    def show_devices(self, devices):
+        current = self.get_current_device()
         self.device_combo.clear()
+        self.roku_controller.devices = list(devices)
         for device in devices:
             self.device_combo.addItem(f"{device['name']} ({device['ip']})")
+        # Keep the selected device selected if it's still there
+        for index, device in enumerate(devices):
+            if current and (device['ip'], device.get('serial')) == (current['ip'], current.get('serial')):
+                self.device_combo.setCurrentIndex(index)
+
+    def scan_finished(self, devices):
+        self.show_devices(devices)
         if not devices:
             self.device_combo.addItem("No devices found")
         self.scan_button.setEnabled(True)
         self.scan_button.setText("Scan for Devices")
-        self.roku_controller.devices = devices
         self.display_window.append(f"Found {len(devices)} Roku device(s)")
 
     def get_current_device(self):
-        if self.device_combo.currentIndex() >= 0:
+        if 0 <= self.device_combo.currentIndex() < len(self.roku_controller.devices):
             return self.roku_controller.devices[self.device_combo.currentIndex()]
         return None
 
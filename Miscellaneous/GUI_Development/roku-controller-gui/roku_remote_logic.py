@@ -1,47 +1,121 @@
-import socket
-import ipaddress
-import concurrent.futures
+import json
+import os
+import sys
+import time
+
 import requests
 
-class RokuController:
-    def __init__(self):
-        self.devices = []
+# The scanner is shared with the command line controller in Networking/
+NETWORKING_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Networking'))
+if NETWORKING_DIR not in sys.path:
+    sys.path.append(NETWORKING_DIR)
+import roku_ecp
+import roku_scanner
+
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.expanduser('~'), '.roku_devices.json')
+STALE_AFTER = 24 * 60 * 60
+FORGET_AFTER = 30 * 24 * 60 * 60
+
+
+class DeviceRegistry:
+    """
+    Devices seen on earlier runs, kept in a small JSON file.
 
-    def scan_network(self):
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
-
-        network = ipaddress.IPv4Network(f"{local_ip}/24", strict=False)
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=100) as executor:
-            future_to_ip = {executor.submit(self._scan_ip, ip): ip for ip in network.hosts()}
-            for future in concurrent.futures.as_completed(future_to_ip):
-                try:
-                    result = future.result()
-                    if result:
-                        self.devices.append(result)
-                except Exception as e:
-                    ip = future_to_ip[future]
-                    print(f"Error processing result for {ip}: {str(e)}")
-
-    def _scan_ip(self, ip):
+    Each device is stored with its IP, serial, name and when it was last seen,
+    keyed on the serial so a device that moved to a new address replaces its
+    old entry. The time of the last full scan is kept too, so callers can
+    tell when the cache is too old to trust on its own.
+    """
+
+    def __init__(self, path=DEFAULT_REGISTRY_PATH):
+        self.path = path
+        self.entries = {}
+        self.last_scan = 0
         try:
-            with socket.create_connection((str(ip), 8060), timeout=1):
-                response = requests.get(f"http://{ip}:8060/query/device-info", timeout=2)
-                if response.status_code == 200:
-                    info = response.text
-                    name = info.split("<friendly-device-name>")[1].split("</friendly-device-name>")[0]
-                    return {'ip': str(ip), 'name': name}
-        except (socket.timeout, ConnectionRefusedError, requests.RequestException):
+            with open(path) as file:
+                data = json.load(file)
+            self.entries = {self._key(device): device for device in data.get('devices', [])}
+            self.last_scan = data.get('last_scan', 0)
+        except (OSError, ValueError, AttributeError):
             pass
-        except Exception as e:
-            print(f"Unexpected error scanning {ip}: {str(e)}")
-        return None
+
+    @staticmethod
+    def _key(device):
+        return device.get('serial') or device['ip']
+
+    def devices(self):
+        """Return the known devices, most recently seen first."""
+        return sorted(self.entries.values(), key=lambda device: device['last_seen'], reverse=True)
+
+    def current(self):
+        """Return the devices seen since the last full scan, which are expected to still be around."""
+        return [device for device in self.devices() if device['last_seen'] >= self.last_scan]
+
+    def is_stale(self, max_age=STALE_AFTER):
+        return not self.entries or time.time() - self.last_scan > max_age
+
+    def update(self, devices, full_scan=False):
+        now = time.time()
+        for device in devices:
+            # A device found at another device's old address takes it over
+            for key in [key for key, entry in self.entries.items() if entry['ip'] == device['ip']]:
+                del self.entries[key]
+            self.entries[self._key(device)] = {**device, 'last_seen': now}
+        if full_scan:
+            self.last_scan = now
+        self.entries = {
+            key: device for key, device in self.entries.items() if now - device['last_seen'] <= FORGET_AFTER
+        }
+        self.save()
+
+    def save(self):
+        # Write to a temporary file first so a crash can't leave a truncated registry
+        temporary_path = f"{self.path}.tmp"
+        try:
+            with open(temporary_path, 'w') as file:
+                json.dump({'last_scan': self.last_scan, 'devices': self.devices()}, file, indent=2)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            print(f"Error saving device registry: {str(e)}")
+
+
+class RokuController:
+    def __init__(self, registry=None):
+        self.devices = []
+        self.registry = registry if registry is not None else DeviceRegistry()
+        self.ecp = roku_ecp.ECPClient()
+
+    def scan_network(self, networks=None, on_device=None, **options):
+        self.devices.extend(roku_scanner.scan_network(networks, on_device=on_device, **options))
+
+    def cached_devices(self):
+        return self.registry.current()
+
+    def refresh_devices(self, full_scan=False, on_device=None):
+        """
+        Return the devices currently on the network and record them.
+
+        Unless `full_scan` is set, the cached devices are probed at their last
+        address first, all at once, which takes one round trip. The network
+        is only scanned when that leaves a device unaccounted for, or the
+        cache is empty or stale.
+        """
+        if not full_scan:
+            cached = self.registry.current()
+            devices = roku_scanner.revalidate(cached)
+            if cached and len(devices) == len(cached) and not self.registry.is_stale():
+                self.registry.update(devices)
+                for device in devices:
+                    if on_device:
+                        on_device(device)
+                return devices
+        devices = roku_scanner.scan_network(on_device=on_device)
+        self.registry.update(devices, full_scan=True)
+        return devices
+
     def _send_command(self, ip, command):
         try:
-            response = requests.post(f"http://{ip}:8060/{command}", timeout=5)
+            response = self.ecp.post(ip, command, timeout=5)
             if response.status_code == 200:
                 return f"Success: {response.status_code}"
             else:
@@ -51,7 +125,7 @@ class RokuController:
 
     def list_apps(self, ip):
         try:
-            response = requests.get(f"http://{ip}:8060/query/apps", timeout=2)
+            response = self.ecp.get(ip, "query/apps", timeout=2)
             if response.status_code == 200:
                 return response.text
             else:
@@ -1,52 +1,26 @@
-import socket
-import ipaddress
-import concurrent.futures
 import requests
 
+import roku_ecp
+import roku_scanner
+
 
 class RokuController:
     def __init__(self):
         self.devices = []
+        self.ecp = roku_ecp.ECPClient()
 
-    def scan_network(self):
-        # Get the local IP address
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
-
-        # Determine the network to scan
-        network = ipaddress.IPv4Network(f"{local_ip}/24", strict=False)
-        print(f"Scanning network: {network}")
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=100) as executor:
-            future_to_ip = {executor.submit(self._scan_ip, ip): ip for ip in network.hosts()}
-            for future in concurrent.futures.as_completed(future_to_ip):
-                try:
-                    result = future.result()
-                    if result:
-                        self.devices.append(result)
-                except Exception as e:
-                    ip = future_to_ip[future]
-                    print(f"Error processing result for {ip}: {str(e)}")
-
-    def _scan_ip(self, ip):
-        try:
-            with socket.create_connection((str(ip), 8060), timeout=1):
-                response = requests.get(f"http://{ip}:8060/query/device-info", timeout=2)
-                if response.status_code == 200:
-                    info = response.text
-                    name = info.split("<friendly-device-name>")[1].split("</friendly-device-name>")[0]
-                    return {'ip': str(ip), 'name': name}
-        except (socket.timeout, ConnectionRefusedError, requests.RequestException):
-            pass
-        except Exception as e:
-            print(f"Unexpected error scanning {ip}: {str(e)}")
-        return None
+    def scan_network(self, networks=None, **options):
+        # Determine the networks to scan
+        if networks is None:
+            networks = roku_scanner.interface_networks()
+        print(f"Scanning networks: {', '.join(str(network) for network in networks)}")
+        self.devices.extend(roku_scanner.scan_network(
+            networks, on_device=lambda device: print(f"Found {device['name']} at {device['ip']}"), **options
+        ))
 
     def _send_command(self, ip, command):
         try:
-            response = requests.post(f"http://{ip}:8060/{command}", timeout=2)
+            response = self.ecp.post(ip, command, timeout=2)
             if response.status_code == 200:
                 print(f"Successfully sent command '{command}' to Roku device at {ip}")
             else:
@@ -0,0 +1,70 @@
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from roku_scanner import ECP_PORT
+
+POOL_SIZE = 4
+LATENCY_SAMPLES = 200
+
+
+class ECPClient:
+    """
+    HTTP client for Roku ECP commands, with one keep-alive session per device.
+
+    Every device gets its own `requests.Session`, so repeated keypresses reuse
+    an open TCP connection instead of doing a handshake each time. The pool
+    holds a few connections so overlapping commands (e.g. from a held key)
+    don't queue behind each other, and failed requests aren't retried since a
+    repeated keypress would do something else. The latency of each command is
+    kept per device and command, for the last `LATENCY_SAMPLES` of each.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, port=ECP_PORT):
+        self.pool_size = pool_size
+        self.port = port
+        self.sessions = {}
+        self.latencies = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLES))
+        self.lock = threading.Lock()
+
+    def session(self, ip):
+        with self.lock:
+            session = self.sessions.get(ip)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount(f"http://{ip}:{self.port}/", adapter)
+                self.sessions[ip] = session
+            return session
+
+    def request(self, method, ip, command, timeout):
+        """Send an ECP request and record how long it took. Raises requests.RequestException."""
+        start = time.perf_counter()
+        try:
+            return self.session(ip).request(method, f"http://{ip}:{self.port}/{command}", timeout=timeout)
+        finally:
+            # Key on the command without its query string, e.g. search/browse
+            self.latencies[(ip, command.partition('?')[0])].append(time.perf_counter() - start)
+
+    def post(self, ip, command, timeout):
+        return self.request('POST', ip, command, timeout)
+
+    def get(self, ip, command, timeout):
+        return self.request('GET', ip, command, timeout)
+
+    def latency_summary(self):
+        """Return {(ip, command): (count, median ms, max ms)} for the recorded commands."""
+        return {
+            key: (len(samples), statistics.median(samples) * 1000, max(samples) * 1000)
+            for key, samples in list(self.latencies.items()) if samples
+        }
+
+    def close(self):
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
@@ -0,0 +1,80 @@
+import argparse
+import http.server
+import statistics
+import threading
+import time
+
+import requests
+
+from roku_ecp import ECPClient
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Answers ECP keypresses like a Roku does: 200 with an empty body, connection kept open."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in(host="127.0.0.1"):
+    server = http.server.ThreadingHTTPServer((host, 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(send, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        send()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def benchmark(ip=None, port=None, count=500, command="keypress/Lit_a"):
+    """
+    Compare a new connection per keypress with the pooled keep-alive client.
+
+    Without an ip, a local HTTP stand-in for the ECP server is started.
+    Against a real device, use a harmless command such as a literal key.
+    """
+    server = None
+    if ip is None:
+        server = start_stand_in()
+        ip, port = server.server_address
+
+    client = ECPClient(port=port)
+    results = {
+        'per request': measure(lambda: requests.post(f"http://{ip}:{port}/{command}", timeout=2), count),
+        'pooled': measure(lambda: client.post(ip, command, timeout=2), count),
+    }
+    client.close()
+    if server:
+        server.shutdown()
+
+    print(f"{count} x POST /{command} to {ip}:{port}")
+    print(f"{'mode':>12} {'median ms':>10} {'mean ms':>8} {'p95 ms':>7}")
+    for name, latencies in results.items():
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"{name:>12} {statistics.median(latencies) * 1000:>10.3f} "
+              f"{statistics.mean(latencies) * 1000:>8.3f} {p95 * 1000:>7.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pooled keep-alive ECP commands against one connection per command.')
+    parser.add_argument('--ip', help='a real Roku to benchmark against (default: a local stand-in server)')
+    parser.add_argument('--port', type=int, default=8060, help='ECP port of the real device')
+    parser.add_argument('-n', '--count', type=int, default=500)
+    args = parser.parse_args()
+    benchmark(args.ip, args.port, args.count)
+
+
+if __name__ == "__main__":
+    main()
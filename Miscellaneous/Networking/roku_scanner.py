@@ -0,0 +1,477 @@
+import argparse
+import asyncio
+import errno
+import ipaddress
+import socket
+import struct
+import sys
+import time
+from urllib.parse import urlparse
+
+ECP_PORT = 8060
+CONCURRENCY = 256
+RATE = 1000
+WIDEST_PREFIX = 16
+CONNECT_TIMEOUT = 0.5
+READ_TIMEOUT = 2
+MAX_RESPONSE_BYTES = 64 << 10
+SSDP_ADDRESS = ("239.255.255.250", 1900)
+SSDP_SEARCH_TARGET = "roku:ecp"
+SSDP_WINDOW = 1.5
+SSDP_ATTEMPTS = 2
+SCAN_METHODS = ('auto', 'ssdp', 'sweep')
+
+
+def local_network(prefix_length=24):
+    """Return the network of the interface used for the default route."""
+    # Connecting a UDP socket sends nothing, it only picks the outgoing interface
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(("8.8.8.8", 80))
+        local_ip = s.getsockname()[0]
+    finally:
+        s.close()
+    return ipaddress.IPv4Network(f"{local_ip}/{prefix_length}", strict=False)
+
+
+def _interface_addresses():
+    # psutil is optional; without it, ask the kernel for each interface's primary address (Linux only)
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        for addresses in psutil.net_if_addrs().values():
+            for address in addresses:
+                if address.family == socket.AF_INET and address.netmask:
+                    yield address.address, address.netmask
+        return
+
+    if not sys.platform.startswith('linux'):
+        return
+    import fcntl
+
+    siocgifaddr, siocgifnetmask = 0x8915, 0x891b
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        for _, name in socket.if_nameindex():
+            request = struct.pack('256s', name[:15].encode())
+            try:
+                address = socket.inet_ntoa(fcntl.ioctl(s.fileno(), siocgifaddr, request)[20:24])
+                netmask = socket.inet_ntoa(fcntl.ioctl(s.fileno(), siocgifnetmask, request)[20:24])
+            except OSError:
+                continue
+            yield address, netmask
+
+
+def _distinct(networks):
+    # Drop networks contained in another one, but don't merge neighbours, they keep their own rate limits
+    kept = []
+    for network in sorted(set(networks), key=lambda network: network.prefixlen):
+        if not any(network.version == other.version and network.subnet_of(other) for other in kept):
+            kept.append(network)
+    return kept
+
+
+def _usable_interfaces():
+    # Loopback, link-local and point-to-point addresses have no devices around them
+    for address, netmask in _interface_addresses():
+        interface = ipaddress.IPv4Interface(f"{address}/{netmask}")
+        if not (interface.ip.is_loopback or interface.ip.is_link_local or interface.network.prefixlen == 32):
+            yield interface
+
+
+def interface_networks(widest_prefix=WIDEST_PREFIX):
+    """
+    Return the IPv4 networks of all local interfaces.
+
+    Loopback, link-local and single-address networks are left out, and
+    networks wider than `widest_prefix` are narrowed to that size around the
+    interface's address. Falls back to `local_network` when no interface can
+    be listed, and returns an empty list when that has no route either.
+    """
+    networks = []
+    for interface in _usable_interfaces():
+        if interface.network.prefixlen < widest_prefix:
+            interface = ipaddress.IPv4Interface(f"{interface.ip}/{widest_prefix}")
+        networks.append(interface.network)
+    if not networks:
+        try:
+            networks.append(local_network())
+        except OSError:
+            pass
+    return _distinct(networks)
+
+
+def interface_addresses():
+    """Return the IPv4 address of each local interface that `interface_networks` would sweep."""
+    addresses = []
+    for interface in _usable_interfaces():
+        if str(interface.ip) not in addresses:
+            addresses.append(str(interface.ip))
+    return addresses
+
+
+def parse_networks(networks):
+    """Turn a CIDR string, a comma-separated list of them or an iterable of networks into network objects."""
+    if isinstance(networks, str):
+        networks = networks.split(',')
+    elif isinstance(networks, (ipaddress.IPv4Network, ipaddress.IPv6Network)):
+        networks = [networks]
+    return _distinct(ipaddress.ip_network(str(network).strip(), strict=False) for network in networks)
+
+
+def _tag_text(info, tag):
+    start = info.find(f"<{tag}>")
+    end = info.find(f"</{tag}>", start)
+    if start < 0 or end < 0:
+        return None
+    return info[start + len(tag) + 2:end]
+
+
+def parse_device_info(ip, info):
+    """Build a device dict from a /query/device-info response, or None if it isn't a Roku."""
+    name = _tag_text(info, "friendly-device-name")
+    if name is None:
+        return None
+    return {'ip': str(ip), 'name': name, 'serial': _tag_text(info, "serial-number")}
+
+
+async def probe(ip, port=ECP_PORT, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+    """
+    Check one address for a Roku and query its device info.
+
+    The connect is non-blocking and gives up after `connect_timeout`. The
+    device-info request is then sent as a plain HTTP/1.1 GET over the same
+    connection, so each host costs one TCP handshake. Running out of file
+    descriptors raises OSError rather than counting the host as having no
+    Roku.
+
+    Returns:
+        dict: The device's 'ip', 'name' and 'serial', or None.
+    """
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(str(ip), port), connect_timeout)
+    except OSError as e:
+        if e.errno in (errno.EMFILE, errno.ENFILE):
+            raise
+        return None
+    except asyncio.TimeoutError:
+        return None
+    try:
+        writer.write(
+            f"GET /query/device-info HTTP/1.1\r\nHost: {ip}:{port}\r\nConnection: close\r\n\r\n".encode()
+        )
+        # The reply ends when the device closes the connection
+        response = b""
+        while len(response) < MAX_RESPONSE_BYTES:
+            chunk = await asyncio.wait_for(reader.read(MAX_RESPONSE_BYTES - len(response)), read_timeout)
+            if not chunk:
+                break
+            response += chunk
+    except (OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        writer.close()
+
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = head.split(b" ", 2)
+    if len(status) < 2 or status[1] != b"200":
+        return None
+    return parse_device_info(ip, body.decode('utf-8', 'replace'))
+
+
+async def scan(hosts, port=ECP_PORT, concurrency=CONCURRENCY, connect_timeout=CONNECT_TIMEOUT,
+               read_timeout=READ_TIMEOUT, rate=None, on_device=None, limit=None):
+    """
+    Probe many addresses concurrently.
+
+    Args:
+        hosts (iterable): IP addresses to probe, e.g. `network.hosts()`.
+        port (int): The ECP port.
+        concurrency (int): Most connections open at once, which bounds the
+            number of file descriptors in use however large the range is.
+        connect_timeout (float): Seconds to wait for each TCP connect.
+        read_timeout (float): Seconds to wait for the device-info reply.
+        rate (float): Most connection attempts started per second, or None
+            for no limit.
+        on_device (callable): Called with each device as soon as it answers.
+        limit (asyncio.Semaphore): Shared with other scans running at the
+            same time, so their connections count against one cap.
+
+    Returns:
+        list: Device dicts in the order they answered.
+
+    A fixed set of `concurrency` workers pulls addresses from the shared
+    iterator, so neither tasks nor sockets grow with the size of the range.
+    With a rate, the workers take evenly spaced start times.
+    """
+    hosts = iter(hosts)
+    devices = []
+    loop = asyncio.get_running_loop()
+    next_start = loop.time()
+
+    async def worker():
+        nonlocal next_start
+        for ip in hosts:
+            if rate:
+                delay = next_start - loop.time()
+                next_start = max(next_start, loop.time()) + 1 / rate
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            if limit:
+                async with limit:
+                    device = await probe(ip, port, connect_timeout, read_timeout)
+            else:
+                device = await probe(ip, port, connect_timeout, read_timeout)
+            if device:
+                devices.append(device)
+                if on_device:
+                    on_device(device)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return devices
+
+
+class _SSDPProtocol(asyncio.DatagramProtocol):
+    def __init__(self, search_target):
+        self.search_target = search_target
+        self.locations = {}
+
+    def datagram_received(self, data, address):
+        lines = data.decode('utf-8', 'replace').split("\r\n")
+        if not lines[0].startswith("HTTP/1.1 200"):
+            return
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get('st') != self.search_target or 'location' not in headers:
+            return
+        location = urlparse(headers['location'])
+        serial = headers.get('usn', '').rpartition(':')[2] or None
+        # A device answers every M-SEARCH, keep one entry per address
+        self.locations[(location.hostname, location.port or ECP_PORT)] = serial
+
+
+def _ssdp_socket(interface=None):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    try:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+        if interface:
+            # Without this the search only leaves through the default route's interface
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface))
+        sock.bind((interface or "", 0))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+async def discover(window=SSDP_WINDOW, address=SSDP_ADDRESS, search_target=SSDP_SEARCH_TARGET,
+                   attempts=SSDP_ATTEMPTS, interfaces=None):
+    """
+    Find ECP endpoints with an SSDP M-SEARCH.
+
+    A multicast search is sent from every local interface, so devices on a
+    second network (e.g. a wired LAN next to Wi-Fi) answer too.
+
+    Args:
+        window (float): Seconds to collect responses for.
+        address (tuple): Where to send the search, the SSDP multicast group
+            by default. A unicast address works for testing against a local
+            responder.
+        search_target (str): The ST header, 'roku:ecp' for Roku devices.
+        attempts (int): Searches sent over the window, since UDP may drop
+            one.
+        interfaces (list): Local IPv4 addresses to search from, by default
+            those of `interface_addresses`. Not used for a unicast address.
+
+    Returns:
+        dict: (host, port) of each responder mapped to its serial number.
+    """
+    message = (
+        "M-SEARCH * HTTP/1.1\r\n"
+        f"HOST: {SSDP_ADDRESS[0]}:{SSDP_ADDRESS[1]}\r\n"
+        'MAN: "ssdp:discover"\r\n'
+        f"ST: {search_target}\r\n"
+        f"MX: {max(1, int(window))}\r\n\r\n"
+    ).encode()
+    if ipaddress.ip_address(address[0]).is_multicast:
+        if interfaces is None:
+            interfaces = interface_addresses()
+    else:
+        interfaces = []
+
+    loop = asyncio.get_running_loop()
+    # All sockets feed one protocol, so a device seen on two interfaces is listed once
+    protocol = _SSDPProtocol(search_target)
+    transports = []
+    try:
+        for interface in interfaces or [None]:
+            try:
+                sock = _ssdp_socket(interface)
+            except OSError as e:
+                print(f"Error searching from {interface}: {str(e)}")
+                continue
+            transport, _ = await loop.create_datagram_endpoint(lambda: protocol, sock=sock)
+            transports.append(transport)
+        if not transports:
+            transports.append((await loop.create_datagram_endpoint(lambda: protocol, sock=_ssdp_socket()))[0])
+        for _ in range(attempts):
+            for transport in transports:
+                transport.sendto(message, address)
+            await asyncio.sleep(window / attempts)
+    finally:
+        for transport in transports:
+            transport.close()
+    return protocol.locations
+
+
+async def discover_devices(window=SSDP_WINDOW, address=SSDP_ADDRESS, read_timeout=READ_TIMEOUT):
+    """
+    Discover Rokus over SSDP and query each one's device info.
+
+    Returns:
+        list: Device dicts. A device that answered the search but not the
+        device-info query (e.g. with ECP access limited) is still listed,
+        named after its address.
+    """
+    locations = await discover(window, address)
+    results = await asyncio.gather(*(
+        probe(host, port, CONNECT_TIMEOUT, read_timeout) for host, port in locations
+    ))
+    devices = []
+    for ((host, port), serial), device in zip(locations.items(), results):
+        devices.append(device or {'ip': host, 'name': host, 'serial': serial})
+    return devices
+
+
+async def scan_networks(networks=None, rate=RATE, on_device=None, concurrency=CONCURRENCY, **options):
+    """
+    Sweep several networks at the same time.
+
+    Args:
+        networks: CIDR strings or network objects, see `parse_networks`. By
+            default every local interface's network.
+        rate (float): Connection attempts per second, per network.
+        on_device (callable): Called with each device as soon as it answers.
+        concurrency (int): Most connections open at once across all
+            networks, so the number of file descriptors stays bounded however
+            many interfaces there are.
+        **options: Passed on to `scan`, e.g. connect_timeout.
+
+    Returns:
+        list: The devices found on all networks.
+    """
+    networks = interface_networks() if networks is None else parse_networks(networks)
+    limit = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*(
+        scan(network.hosts(), rate=rate, on_device=on_device, concurrency=concurrency, limit=limit, **options)
+        for network in networks
+    ))
+    return [device for devices in results for device in devices]
+
+
+async def find_devices(networks=None, method='auto', ssdp_window=SSDP_WINDOW, ssdp_address=SSDP_ADDRESS,
+                       on_device=None, **options):
+    """
+    Find Roku devices with SSDP, a sweep of `networks`, or both.
+
+    In 'auto' mode the SSDP search runs first, and the networks are only
+    swept when no device answered it, e.g. on networks that filter multicast.
+    SSDP results outside explicitly given networks are ignored. Without
+    networks, the sweep covers every local interface.
+    """
+    if method not in SCAN_METHODS:
+        raise ValueError(f"Unknown scan method: {method}")
+    if networks is not None:
+        networks = parse_networks(networks)
+    if method != 'sweep':
+        devices = await discover_devices(ssdp_window, ssdp_address)
+        if networks is not None:
+            devices = [
+                device for device in devices
+                if any(ipaddress.ip_address(device['ip']) in network for network in networks)
+            ]
+        if on_device:
+            for device in devices:
+                on_device(device)
+        if devices or method == 'ssdp':
+            return devices
+    return await scan_networks(networks, on_device=on_device, **options)
+
+
+async def iter_devices(networks=None, method='auto', **options):
+    """Yield devices from `find_devices` as they are found."""
+    queue = asyncio.Queue()
+    task = asyncio.ensure_future(find_devices(networks, method, on_device=queue.put_nowait, **options))
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait((getter, task), return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                getter.cancel()
+                break
+            yield getter.result()
+        while not queue.empty():
+            yield queue.get_nowait()
+        task.result()
+    finally:
+        task.cancel()
+
+
+async def check_devices(devices, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+    """
+    Probe known devices at their last address, all at the same time.
+
+    Returns:
+        list: Fresh device dicts for those still answering there. An address
+        now held by a Roku with a different serial doesn't count.
+    """
+    results = await asyncio.gather(*(
+        probe(device['ip'], ECP_PORT, connect_timeout, read_timeout) for device in devices
+    ))
+    return [
+        result for device, result in zip(devices, results)
+        if result and (device.get('serial') is None or result['serial'] == device['serial'])
+    ]
+
+
+def revalidate(devices, **options):
+    """Return the known devices still answering at their address, see `check_devices`."""
+    return asyncio.run(check_devices(devices, **options))
+
+
+def scan_network(network=None, method='auto', on_device=None, **options):
+    """Find the Roku devices on one or more networks (by default all local ones), see `find_devices`."""
+    return asyncio.run(find_devices(network, method, on_device=on_device, **options))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find Roku devices on the network.')
+    parser.add_argument('networks', nargs='*',
+                        help='networks to sweep, e.g. 192.168.1.0/24 (default: those of all local interfaces)')
+    parser.add_argument('-c', '--concurrency', type=int, default=CONCURRENCY, help='most open connections in total')
+    parser.add_argument('-r', '--rate', type=float, default=RATE, help='connection attempts per second per network')
+    parser.add_argument('--timeout', type=float, default=CONNECT_TIMEOUT, help='connect timeout in seconds')
+    parser.add_argument('-m', '--method', choices=SCAN_METHODS, default='auto',
+                        help='SSDP discovery, a sweep of every address, or SSDP falling back to a sweep')
+    parser.add_argument('--window', type=float, default=SSDP_WINDOW, help='seconds to wait for SSDP responses')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def print_device(device):
+        print(f"- {device['name']} at {device['ip']} ({time.perf_counter() - start:.2f} s)")
+
+    try:
+        devices = scan_network(args.networks or None, args.method, on_device=print_device, ssdp_window=args.window,
+                               concurrency=args.concurrency, rate=args.rate, connect_timeout=args.timeout)
+    except OSError as e:
+        print(f"Error scanning: {str(e)} (try a lower --concurrency)")
+        return
+    print(f"Found {len(devices)} device(s) in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
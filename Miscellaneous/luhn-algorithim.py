@@ -1,3 +1,18 @@
+import argparse
+import collections
+import concurrent.futures
+import csv
+import os
+
+import numpy as np
+
+# Digit sum of 2 * d for d in 0-9, replaces the `number // 10 + number % 10` branch
+DOUBLED_DIGITS = np.array([0, 2, 4, 6, 8, 1, 3, 5, 7, 9], dtype=np.uint8)
+BATCH_ROWS = 1 << 20
+CHUNK_SIZE = 16 << 20
+CARD_TRANSLATION = str.maketrans({'-': '', ' ': ''})
+
+
 def verify_card_number(card_number):
     sum_of_odd_digits = 0
     card_number_reversed = card_number[::-1]
@@ -16,14 +31,287 @@ def verify_card_number(card_number):
     total = sum_of_odd_digits + sum_of_even_digits
     return total % 10 == 0
 
+
+def calculate_check_digit(partial_number):
+    """
+    Calculate the Luhn check digit for a card number without its last digit.
+
+    Args:
+        partial_number (str): The card number digits, excluding the check digit.
+
+    Returns:
+        int: The digit which makes `partial_number + str(digit)` pass
+        `verify_card_number`.
+    """
+    total = 0
+    # Once the check digit is appended, the rightmost digit here gets doubled
+    for position, digit in enumerate(reversed(partial_number)):
+        number = int(digit)
+        total += int(DOUBLED_DIGITS[number]) if position % 2 == 0 else number
+    return (10 - total % 10) % 10
+
+
+def generate_card_numbers(prefix, length, count, batch_size=BATCH_ROWS, as_bytes=False, seed=None):
+    """
+    Generate random Luhn-valid card numbers for an issuer prefix.
+
+    Args:
+        prefix (str): The issuer prefix every number starts with, e.g. '4'.
+        length (int): The total number of digits, including the check digit.
+        count (int): How many card numbers to generate.
+        batch_size (int): How many card numbers to yield at a time.
+        as_bytes (bool): Yield newline-terminated bytes instead of arrays.
+        seed (int): Seed for the random generator, for repeatable output.
+
+    Yields:
+        numpy.ndarray or bytes: A NumPy `S<length>` array per batch, or the same
+        numbers as newline-separated bytes if `as_bytes` is set.
+    """
+    if not prefix.isdigit() or len(prefix) >= length:
+        raise ValueError("prefix must be digits and shorter than length")
+
+    rng = np.random.default_rng(seed)
+    prefix_digits = np.frombuffer(prefix.encode(), dtype=np.uint8) - np.uint8(ord('0'))
+    random_width = length - len(prefix) - 1
+    # Columns whose distance from the check digit is odd get doubled
+    doubled = ((length - 1 - np.arange(length - 1)) & 1).astype(bool)
+    prefix_sum = int(np.where(doubled[:len(prefix)], DOUBLED_DIGITS[prefix_digits], prefix_digits).sum())
+    random_doubled = doubled[len(prefix):]
+    row_width = length + 1 if as_bytes else length
+
+    for start in range(0, count, batch_size):
+        rows = min(batch_size, count - start)
+        block = np.empty((rows, row_width), dtype=np.uint8)
+        block[:, :len(prefix)] = prefix_digits
+        digits = rng.integers(0, 10, size=(rows, random_width), dtype=np.uint8)
+        block[:, len(prefix):length - 1] = digits
+
+        totals = np.where(random_doubled, DOUBLED_DIGITS[digits], digits).sum(axis=1, dtype=np.int64)
+        block[:, length - 1] = (10 - (totals + prefix_sum) % 10) % 10
+        block[:, :length] += np.uint8(ord('0'))
+
+        if as_bytes:
+            block[:, length] = ord('\n')
+            yield block.tobytes()
+        else:
+            yield block.view(f'S{length}').ravel()
+
+
+def _as_byte_array(card_numbers):
+    if not isinstance(card_numbers, np.ndarray):
+        card_numbers = np.array(list(card_numbers))
+    if card_numbers.dtype.kind != 'S':
+        card_numbers = card_numbers.astype('S')
+    return card_numbers.ravel()
+
+
+def _verify_block(block):
+    width = block.dtype.itemsize
+    digits = block.view(np.uint8).reshape(-1, width) - np.uint8(ord('0'))
+    lengths = np.char.str_len(block)
+
+    columns = np.arange(width)
+    in_number = columns < lengths[:, None]
+    if np.any(digits[in_number] > 9):
+        raise ValueError("card numbers must contain only the digits 0-9")
+    digits[~in_number] = 0
+
+    # Every second digit counting from the right end of each number is doubled
+    doubled = ((lengths[:, None] - 1 - columns) & 1).astype(bool)
+    digits = np.where(doubled, DOUBLED_DIGITS[digits], digits)
+    return digits.sum(axis=1, dtype=np.int64) % 10 == 0
+
+
+def verify_card_numbers(card_numbers):
+    """
+    Verify a batch of card numbers with the Luhn algorithm.
+
+    Args:
+        card_numbers (iterable or numpy.ndarray): Card numbers as strings, bytes
+            or a NumPy string array. Numbers may have different lengths.
+
+    Returns:
+        numpy.ndarray: Boolean mask, True where the card number is valid. The
+        result matches `verify_card_number` for every element.
+
+    Raises:
+        ValueError: If a card number contains anything other than digits.
+    """
+    card_numbers = _as_byte_array(card_numbers)
+    mask = np.empty(len(card_numbers), dtype=bool)
+    if card_numbers.dtype.itemsize == 0:
+        mask[:] = True
+        return mask
+
+    for start in range(0, len(card_numbers), BATCH_ROWS):
+        stop = start + BATCH_ROWS
+        mask[start:stop] = _verify_block(card_numbers[start:stop])
+    return mask
+
+
+def _split_lines(text):
+    # Only '\n' ends a line, as in _read_chunks; str.splitlines also breaks at \x0b, \x1c, \u2028 and others
+    lines = [line + '\n' for line in text.split('\n')]
+    lines[-1] = lines[-1][:-1]
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def validate_records(text, csv_column=None):
+    """
+    Split newline-delimited records into valid and invalid ones.
+
+    Args:
+        text (str): Whole lines of card numbers or whole CSV rows.
+        csv_column (int): Index of the card number column for CSV input, or None
+            if each line is just a card number.
+
+    A CSV row with a quoted field holding a newline spans several lines and
+    is kept together as one record.
+
+    Returns:
+        tuple: The valid records, the invalid records (both as text, in input
+        order) and the number of each.
+    """
+    lines = _split_lines(text)
+    if csv_column is None:
+        records = lines
+        fields = [line.rstrip('\r\n') for line in lines]
+    else:
+        records, fields = [], []
+        reader = csv.reader(lines)
+        start = 0
+        for row in reader:
+            # line_num counts the lines read so far, which tells which lines made up this row
+            records.append(''.join(lines[start:reader.line_num]))
+            start = reader.line_num
+            fields.append(row[csv_column] if len(row) > csv_column else '')
+    numbers = [field.translate(CARD_TRANSLATION) for field in fields]
+
+    # Blank or non-numeric records are invalid rather than an error
+    well_formed = np.fromiter((n.isascii() and n.isdigit() for n in numbers), dtype=bool, count=len(numbers))
+    mask = np.zeros(len(numbers), dtype=bool)
+    if well_formed.any():
+        mask[well_formed] = verify_card_numbers(np.array(numbers)[well_formed])
+
+    valid = ''.join(record for record, ok in zip(records, mask) if ok)
+    invalid = ''.join(record for record, ok in zip(records, mask) if not ok)
+    valid_count = int(mask.sum())
+    return valid, invalid, valid_count, len(records) - valid_count
+
+
+def _read_line(file):
+    # readline also stops at a lone '\r' in a file opened with newline=''
+    parts = [file.readline()]
+    while parts[-1] and not parts[-1].endswith('\n'):
+        parts.append(file.readline())
+    return ''.join(parts)
+
+
+def _read_chunks(file, chunk_size, csv_records=False):
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        # Finish the last line so records never straddle two chunks
+        parts = [chunk, _read_line(file)]
+        if csv_records:
+            # An odd number of quotes means a quoted field, newlines and all, is still open
+            quotes = chunk.count('"') + parts[-1].count('"')
+            while quotes % 2 and parts[-1]:
+                parts.append(_read_line(file))
+                quotes += parts[-1].count('"')
+        yield ''.join(parts)
+
+
+def validate_file(path, valid_path, invalid_path, csv_column=None, header=False,
+                  workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Validate every card number in a newline-delimited or CSV file.
+
+    Args:
+        path (str): The file to validate, one record per line.
+        valid_path (str): Where records with a valid card number are written.
+        invalid_path (str): Where all other records are written.
+        csv_column (int): Index of the card number column for CSV input, or None
+            if each line is just a card number.
+        header (bool): Copy the first line to both outputs without checking it.
+        workers (int): Number of worker processes, defaults to the CPU count.
+        chunk_size (int): Approximate number of characters per chunk.
+
+    The file is read in chunks which are checked in a process pool. At most two
+    chunks per worker are in flight at any time, so memory use does not depend
+    on the size of the file. Records keep their input order in both outputs.
+    A chunk always ends with a whole record, also when a quoted CSV field
+    holds a newline (quotes inside a field are expected doubled, as the csv
+    module writes them).
+
+    Returns:
+        tuple: The number of valid and invalid records.
+    """
+    workers = workers or os.cpu_count() or 1
+    valid_count = invalid_count = 0
+
+    with open(path, newline='') as source, \
+            open(valid_path, 'w', newline='') as valid_file, \
+            open(invalid_path, 'w', newline='') as invalid_file, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = _read_chunks(source, chunk_size, csv_records=csv_column is not None)
+        if header:
+            first_line = _read_line(source)
+            valid_file.write(first_line)
+            invalid_file.write(first_line)
+
+        pending = collections.deque()
+        while True:
+            for chunk in chunks:
+                pending.append(executor.submit(validate_records, chunk, csv_column))
+                if len(pending) >= workers * 2:
+                    break
+            if not pending:
+                break
+            valid, invalid, chunk_valid, chunk_invalid = pending.popleft().result()
+            valid_file.write(valid)
+            invalid_file.write(invalid)
+            valid_count += chunk_valid
+            invalid_count += chunk_invalid
+
+    return valid_count, invalid_count
+
+
 def main():
-    card_number = '4111-1111-9555-1141'
-    card_translation = str.maketrans({'-': '', ' ': ''})
-    translated_card_number = card_number.translate(card_translation)
+    parser = argparse.ArgumentParser(description='Validate card numbers with the Luhn algorithm.')
+    parser.add_argument('path', nargs='?', help='newline-delimited or CSV file of card numbers')
+    parser.add_argument('-n', '--number', help='check a single card number instead of a file')
+    parser.add_argument('--csv-column', type=int, help='column holding the card number in CSV input')
+    parser.add_argument('--header', action='store_true', help='the first line is a header')
+    parser.add_argument('--valid-output', help='output file for valid records (default: PATH.valid)')
+    parser.add_argument('--invalid-output', help='output file for invalid records (default: PATH.invalid)')
+    parser.add_argument('-j', '--workers', type=int, help='number of worker processes')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='characters read per chunk')
+    args = parser.parse_args()
 
-    if verify_card_number(translated_card_number):
-        print('VALID!')
+    if args.number is not None:
+        translated_card_number = args.number.translate(CARD_TRANSLATION)
+        if verify_card_number(translated_card_number):
+            print('VALID!')
+        else:
+            print('INVALID!')
+    elif args.path:
+        valid_count, invalid_count = validate_file(
+            args.path,
+            args.valid_output or f'{args.path}.valid',
+            args.invalid_output or f'{args.path}.invalid',
+            csv_column=args.csv_column,
+            header=args.header,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+        )
+        print(f'{valid_count} valid, {invalid_count} invalid')
     else:
-        print('INVALID!')
+        parser.error('a file or --number is required')
+
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
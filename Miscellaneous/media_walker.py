@@ -0,0 +1,63 @@
+import os
+from typing import NamedTuple
+
+# Extensions treated as video files, shared by video_audio_info.py and the movie database viewer
+MEDIA_EXTENSIONS = frozenset({'.mp4', '.mov', '.avi', '.mkv', '.flv'})
+
+
+class FileEntry(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+    is_dir: bool
+
+
+def has_extension(name, extensions=MEDIA_EXTENSIONS):
+    return os.path.splitext(name)[1].lower() in extensions
+
+
+def walk(directory, extensions=None, include_dirs=False, recursive=True):
+    """
+    Iteratively walk a directory tree with os.scandir.
+
+    Args:
+        directory (str): The root of the tree.
+        extensions (set): Only yield files with one of these lowercase
+            extensions, or every file if None.
+        include_dirs (bool): Also yield an entry for each subdirectory.
+        recursive (bool): Descend into subdirectories, or only list the
+            directory itself.
+
+    Yields:
+        FileEntry: The path, size and mtime of each file (and directory).
+
+    Directories are told apart from files by the DirEntry type, which needs
+    no extra system call on most platforms, and each file's size and mtime come
+    from the DirEntry's own stat result. Files filtered out by extension are
+    never stat'ed. Symlinked directories are not followed, and directories or
+    files that can't be read are skipped.
+    """
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                            if include_dirs:
+                                stat_result = entry.stat(follow_symlinks=False)
+                                yield FileEntry(entry.path, 0, stat_result.st_mtime_ns, True)
+                        elif extensions is None or has_extension(entry.name, extensions):
+                            stat_result = entry.stat()
+                            yield FileEntry(entry.path, stat_result.st_size, stat_result.st_mtime_ns, False)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def walk_media(directory, extensions=MEDIA_EXTENSIONS, recursive=True):
+    """Yield a FileEntry for every media file under a directory."""
+    return walk(directory, extensions, recursive=recursive)
@@ -1,7 +1,168 @@
-import av
+import argparse
+import concurrent.futures
+import csv
+import functools
+import json
 import os
+import sqlite3
+import time
+
+import av
+
+from media_walker import MEDIA_EXTENSIONS, has_extension, walk_media
+
+PROGRESS_INTERVAL = 5.0
+CACHE_FILE_NAME = ".video_audio_info.sqlite"
+OUTPUT_FILE_NAME = "Video-Audio-Information.txt"
+CACHE_BATCH_SIZE = 1000
+REPORT_FIELDS = ['path', 'stream', 'type', 'codec', 'width', 'height', 'frame_rate', 'channels', 'sample_rate',
+                 'bit_rate']
+REPORT_FORMATS = ('jsonl', 'csv', 'parquet')
+REPORT_BUFFER_SIZE = 1 << 20
+PARQUET_BATCH_ROWS = 50000
+# Header-only probing: read at most 512 KiB and analyze at most 0.5 s of streams
+FAST_PROBE_OPTIONS = {'probesize': str(512 << 10), 'analyzeduration': str(500000)}
+# AV_DISPOSITION_ATTACHED_PIC, set on cover art stored as a video stream
+ATTACHED_PIC = 1 << 10
+COVER_ART_CODECS = ('mjpeg', 'png')
+
+def _is_attached_picture(stream):
+    disposition = getattr(stream, 'disposition', None)
+    if disposition is not None:
+        return bool(int(disposition) & ATTACHED_PIC)
+    # PyAV before 12 doesn't expose the disposition
+    return stream.codec_context.name in COVER_ART_CODECS and stream.frames == 1
+
+
+def _read_streams(file_path, container_options=None):
+    """Return the stream dicts of a file and whether all their codec parameters were found."""
+    with av.open(file_path, container_options=container_options) as container:
+        streams = []
+        complete = True
+        for stream in container.streams:
+            bit_rate = stream.bit_rate / 1000 if stream.bit_rate is not None else None
+            if stream.type == 'video':
+                streams.append({
+                    'type': 'video',
+                    'width': stream.codec_context.width,
+                    'height': stream.codec_context.height,
+                    'codec': stream.codec_context.name,
+                    'frame_rate': float(stream.average_rate) if stream.average_rate else None,
+                    'bit_rate': bit_rate,
+                })
+            elif stream.type == 'audio':
+                streams.append({
+                    'type': 'audio',
+                    'codec': stream.codec_context.name,
+                    'channels': stream.codec_context.channels,
+                    'sample_rate': stream.codec_context.sample_rate,
+                    'bit_rate': bit_rate,
+                })
+            else:
+                continue
+            if complete and _missing_codec_parameters(streams[-1], stream):
+                complete = False
+        return streams, complete
+
+
+def _missing_codec_parameters(info, stream):
+    if not info['codec']:
+        return True
+    if info['type'] == 'video':
+        # Cover art is a single picture, it has no frame rate to find
+        return not (info['width'] and info['height'] and (info['frame_rate'] or _is_attached_picture(stream)))
+    return not (info['channels'] and info['sample_rate'])
 
-def process_file(file_path):
+
+def probe_file(file_path, fast=False):
+    """
+    Read the video and audio stream information of a single file.
+
+    Args:
+        file_path (str): The path to the video or audio file, or a binary
+            file object opened on it.
+        fast (bool): Only read the container headers, with probesize and
+            analyzeduration capped by FAST_PROBE_OPTIONS. The file is probed
+            again in full if that leaves codec parameters missing, or if the
+            capped probe couldn't make sense of the data at all. Cover art
+            streams aren't expected to have a frame rate.
+
+    The container is always closed before returning, so walking a large
+    directory doesn't leak file descriptors.
+
+    Returns:
+        list: A dict per video or audio stream, or None if the file holds
+        invalid data.
+    """
+    try:
+        if fast:
+            try:
+                streams, complete = _read_streams(file_path, FAST_PROBE_OPTIONS)
+                if complete:
+                    return streams
+            except av.error.InvalidDataError:
+                # 512 KiB may be too little to detect the format, let the full probe decide
+                pass
+            if hasattr(file_path, 'seek'):
+                file_path.seek(0)
+        return _read_streams(file_path)[0]
+    except av.error.InvalidDataError:
+        print(f"Error processing file {file_path}: Invalid data")
+        return None
+
+
+def _write_streams(file, streams):
+    for stream in streams:
+        bit_rate = stream['bit_rate'] if stream['bit_rate'] is not None else "Unknown"
+        frame_rate = f"{stream['frame_rate']:.2f}" if stream.get('frame_rate') is not None else "Unknown"
+        if stream['type'] == 'video':
+            # Process video stream
+            file.write("Video Information:\n")
+            file.write(f"  Dimensions: {stream['width']}x{stream['height']}\n")
+            file.write(f"  Codec: {stream['codec']}\n")
+            file.write(f"  Frame Rate: {frame_rate}\n")
+            file.write(f"  Bit Rate: {bit_rate} kbps\n")
+
+        elif stream['type'] == 'audio':
+            # Process audio stream
+            file.write("\nAudio Information:\n")
+            file.write(f"  Codec: {stream['codec']}\n")
+            file.write(f"  Channels: {stream['channels']}\n")
+            file.write(f"  Sample Rate: {stream['sample_rate']} Hz\n")
+            file.write(f"  Bit Rate: {bit_rate} kbps\n")
+
+
+def write_stream_info(file_path, streams):
+    """
+    Write stream information to "Video-Audio-Information.txt" next to the file.
+
+    Args:
+        file_path (str): The path to the video or audio file.
+        streams (list): Stream dicts as returned by `probe_file`.
+    """
+    with open(os.path.join(os.path.dirname(file_path), OUTPUT_FILE_NAME), 'w') as file:
+        _write_streams(file, streams)
+
+
+def write_directory_info(dir_path, files):
+    """
+    Write the stream information of every file in a directory to its "Video-Audio-Information.txt".
+
+    Args:
+        dir_path (str): The directory.
+        files (dict): Stream dicts as returned by `probe_file`, by file name.
+
+    The files are written in name order, each under a "File:" line.
+    """
+    with open(os.path.join(dir_path, OUTPUT_FILE_NAME), 'w') as file:
+        for index, name in enumerate(sorted(files)):
+            if index:
+                file.write("\n")
+            file.write(f"File: {name}\n")
+            _write_streams(file, files[name])
+
+
+def process_file(file_path, fast=False):
     """
     Process a single video or audio file.
 
@@ -14,55 +175,392 @@ def process_file(file_path):
     and writes the extracted information to this file.
 
     If the input file is invalid or cannot be opened, an error message is printed.
+    With `fast` set only the container headers are read, see `probe_file`.
+
+    Returns:
+        list: The stream dicts written, or None if the file holds invalid data.
     """
-    try:
-        container = av.open(file_path)
-    except av.error.InvalidDataError:
-        print(f"Error processing file {file_path}: Invalid data")
-        return
+    streams = probe_file(file_path, fast)
+    if streams is not None:
+        write_stream_info(file_path, streams)
+    return streams
 
-    file_dir = os.path.dirname(file_path)
-    file_name = "Video-Audio-Information.txt"
-    output_file = os.path.join(file_dir, file_name)
 
-    with open(output_file, 'w') as file:
-        for stream in container.streams:
-            if stream.type == 'video':
-                # Process video stream
-                file.write("Video Information:\n")
-                file.write(f"  Dimensions: {stream.codec_context.width}x{stream.codec_context.height}\n")
-                file.write(f"  Codec: {stream.codec_context.name}\n")
-                file.write(f"  Frame Rate: {float(stream.average_rate):.2f}\n")
-                bit_rate = stream.bit_rate / 1000 if stream.bit_rate is not None else "Unknown"
-                file.write(f"  Bit Rate: {bit_rate} kbps\n")
+class ProbeCache:
+    """
+    SQLite cache of probe results, stored in the root of the scanned library.
 
-            elif stream.type == 'audio':
-                # Process audio stream
-                file.write("\nAudio Information:\n")
-                file.write(f"  Codec: {stream.codec_context.name}\n")
-                file.write(f"  Channels: {stream.codec_context.channels}\n")
-                file.write(f"  Sample Rate: {stream.codec_context.sample_rate} Hz\n")
-                bit_rate = stream.bit_rate / 1000 if stream.bit_rate is not None else "Unknown"
-                file.write(f"  Bit Rate: {bit_rate} kbps\n")
+    Args:
+        directory (str): The library root the cache file lives in.
 
-def process_directory(directory):
+    Entries are keyed on the file's path relative to the root, its size and
+    its mtime in nanoseconds, so a file only needs probing again when one of
+    those changes. The known keys are loaded into memory up front; whatever
+    is not seen during a scan is removed by `prune`.
+
+    Opening raises sqlite3.Error if the cache can't be created, e.g. on a
+    read-only mount. If writing fails later on, a warning is printed and the
+    rest of the scan goes on without saving to the cache.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.connection = sqlite3.connect(os.path.join(directory, CACHE_FILE_NAME))
+        try:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS probes ("
+                "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, streams TEXT NOT NULL)"
+            )
+            self.known = {
+                path: (size, mtime_ns)
+                for path, size, mtime_ns in self.connection.execute("SELECT path, size, mtime_ns FROM probes")
+            }
+        except sqlite3.Error:
+            self.connection.close()
+            raise
+        self.seen = set()
+        self.pending = []
+        self.writable = True
+
+    def _key(self, file_path):
+        return os.path.relpath(file_path, self.directory)
+
+    def is_current(self, entry):
+        """Mark the file as seen and return True if its cached entry is still valid."""
+        key = self._key(entry.path)
+        self.seen.add(key)
+        return self.known.get(key) == (entry.size, entry.mtime_ns)
+
+    def files_by_directory(self, extensions=None):
+        """Return {directory path: set of file names} for the cached files with one of `extensions`."""
+        directories = {}
+        for path in self.known:
+            if extensions is None or has_extension(path, extensions):
+                dir_path, name = os.path.split(os.path.join(self.directory, path))
+                directories.setdefault(dir_path, set()).add(name)
+        return directories
+
+    def streams(self, file_path):
+        row = self.connection.execute("SELECT streams FROM probes WHERE path = ?", (self._key(file_path),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store(self, entry, streams):
+        if not self.writable:
+            return
+        self.pending.append((self._key(entry.path), entry.size, entry.mtime_ns, json.dumps(streams)))
+        if len(self.pending) >= CACHE_BATCH_SIZE:
+            self.flush()
+
+    def _write(self, statement, rows):
+        if not self.writable:
+            return False
+        try:
+            with self.connection:
+                self.connection.executemany(statement, rows)
+            return True
+        except sqlite3.Error as e:
+            print(f"Warning: can't write the probe cache, continuing without saving to it: {str(e)}")
+            self.writable = False
+            return False
+
+    def flush(self):
+        self._write("INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?)", self.pending)
+        self.pending = []
+
+    def prune(self, extensions=None):
+        """
+        Remove entries for files that were not seen, i.e. have been deleted or renamed.
+
+        Only entries with one of `extensions` are removed, so a scan limited to
+        some file types keeps the entries of the others.
+        """
+        removed = [
+            (path,) for path in self.known.keys() - self.seen
+            if extensions is None or has_extension(path, extensions)
+        ]
+        return len(removed) if self._write("DELETE FROM probes WHERE path = ?", removed) else 0
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+
+def find_media_files(directory, extensions=MEDIA_EXTENSIONS):
+    """
+    Yield the path of every video or audio file under a directory.
+
+    Args:
+        directory (str): The path to the directory to search.
+        extensions (set): Lowercase file extensions to look for.
+    """
+    for entry in walk_media(directory, extensions):
+        yield entry.path
+
+
+class MediaReport:
+    """
+    One report file with a row per stream for a whole library.
+
+    Args:
+        path (str): The report file to create.
+        report_format (str): 'jsonl', 'csv' or 'parquet'. Taken from the file
+            extension if not given.
+
+    Every row goes through a single file handle with a large buffer, and
+    Parquet rows are gathered into row groups, so hundreds of thousands of
+    rows don't turn into as many small writes. Parquet output needs pyarrow.
+    """
+
+    def __init__(self, path, report_format=None):
+        self.format = report_format or os.path.splitext(path)[1].lstrip('.').lower()
+        if self.format not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format {self.format!r}, expected one of {', '.join(REPORT_FORMATS)}")
+
+        self.rows = 0
+        if self.format == 'parquet':
+            import pyarrow
+            import pyarrow.parquet
+
+            self._pyarrow = pyarrow
+            self._schema = pyarrow.schema([
+                ('path', pyarrow.string()), ('stream', pyarrow.int32()), ('type', pyarrow.string()),
+                ('codec', pyarrow.string()), ('width', pyarrow.int32()), ('height', pyarrow.int32()),
+                ('frame_rate', pyarrow.float64()), ('channels', pyarrow.int32()), ('sample_rate', pyarrow.int32()),
+                ('bit_rate', pyarrow.float64()),
+            ])
+            self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+            self._batch = []
+        else:
+            self._file = open(path, 'w', newline='', buffering=REPORT_BUFFER_SIZE)
+            if self.format == 'csv':
+                self._writer = csv.DictWriter(self._file, REPORT_FIELDS, restval='')
+                self._writer.writeheader()
+
+    def add(self, file_path, streams):
+        for index, stream in enumerate(streams):
+            row = {'path': file_path, 'stream': index, **stream}
+            if self.format == 'jsonl':
+                self._file.write(json.dumps(row) + '\n')
+            elif self.format == 'csv':
+                self._writer.writerow(row)
+            else:
+                self._batch.append(row)
+                if len(self._batch) >= PARQUET_BATCH_ROWS:
+                    self._write_batch()
+            self.rows += 1
+
+    def _write_batch(self):
+        if self._batch:
+            self._writer.write_table(self._pyarrow.Table.from_pylist(self._batch, schema=self._schema))
+            self._batch = []
+
+    def close(self):
+        if self.format == 'parquet':
+            self._write_batch()
+            self._writer.close()
+        else:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _safe_probe(probe, file_path):
+    try:
+        return probe(file_path)
+    except Exception as e:
+        print(f"Error processing file {file_path}: {str(e)}")
+        return None
+
+
+def process_directory(directory, workers=8, use_processes=False, max_in_flight=None, use_cache=True, report=None,
+                      fast_probe=False, extensions=MEDIA_EXTENSIONS):
     """
     Process all video and audio files in a directory and its subdirectories.
 
     Args:
         directory (str): The path to the directory to process.
+        workers (int): Number of files probed at the same time. 1 probes the
+            files one after another.
+        use_processes (bool): Use a process pool instead of a thread pool.
+        max_in_flight (int): Most files submitted but not yet finished,
+            defaults to four per worker.
+        use_cache (bool): Skip files whose size and mtime match the probe
+            cache in the directory, see `ProbeCache`. Without write access
+            to the directory the scan runs without the cache.
+        report (MediaReport): Collect the streams of every file into this
+            report instead of writing "Video-Audio-Information.txt" files.
+            Unchanged files are reported from the cache.
+        fast_probe (bool): Read only container headers where possible, see
+            `probe_file`.
+        extensions (set): Lowercase file extensions to process.
 
     This function recursively walks through the specified directory and its
-    subdirectories, and for each video or audio file found (with extensions
-    .mp4, .mov, .avi, or .mkv), it calls the `process_file` function to
-    process that file.
+    subdirectories, and for each video or audio file found (with one of the
+    `extensions`, by default .mp4, .mov, .avi, .mkv or .flv), it probes that
+    file with `probe_file`. Files are probed in a thread or process pool. Only
+    `max_in_flight` files are queued at a time, so the walk never runs far ahead
+    of the workers. A file that fails is reported and skipped, and progress
+    with the rate in files per second is printed every few seconds.
+
+    The workers only probe; the results are gathered here, and each
+    directory's "Video-Audio-Information.txt" is written once, by this
+    thread, after the last of its files has been probed (see
+    `write_directory_info`). Unchanged files are included from the cache. A
+    directory where every file was unchanged is only written when it has no
+    text file yet, or when a file the cache knew there has gone. The text
+    file of a directory with none of its media files left is removed.
+
+    Returns:
+        tuple: The number of files processed successfully, the number that
+        failed and the number skipped because they were unchanged.
     """
-    for root, dirs, files in os.walk(directory):
-        for file_name in files:
-            file_path = os.path.join(root, file_name)
-            if file_path.endswith(('.mp4', '.mov', '.avi', '.mkv')):
-                process_file(file_path)
+    max_in_flight = max_in_flight or workers * 4
+    pool_class = concurrent.futures.ProcessPoolExecutor if use_processes else concurrent.futures.ThreadPoolExecutor
+    cache = None
+    if use_cache:
+        try:
+            cache = ProbeCache(directory)
+        except sqlite3.Error as e:
+            print(f"Warning: can't open the probe cache in {directory}, probing every file: {str(e)}")
+    probe = functools.partial(probe_file, fast=fast_probe)
+    processed = failed = unchanged = 0
+    start = last_report = time.monotonic()
+    # Text mode: per directory, the streams by file name, the unchanged files and the number still being probed
+    directories = {}
+    walking = None
+    # The files each directory had at the last scan, to notice ones that have been deleted since
+    cached_files = cache.files_by_directory(extensions) if cache and not report else {}
+
+    def add_to_directory(file_path, streams, finished):
+        dir_path, name = os.path.split(file_path)
+        directory_info = directories[dir_path]
+        if streams is not None:
+            directory_info['files'][name] = streams
+        directory_info['outstanding'] -= finished
+        write_if_complete(dir_path)
+
+    def write_if_complete(dir_path):
+        # The walk lists a directory's files together, so once it has moved on no more can arrive
+        directory_info = directories[dir_path]
+        if dir_path != walking and not directory_info['outstanding']:
+            del directories[dir_path]
+            files = directory_info['files']
+            deleted = cached_files.pop(dir_path, set()) - directory_info['names']
+            # Unchanged files may never have had a text file, e.g. after a --report run filled the cache
+            if (not directory_info['probed'] and not deleted
+                    and os.path.exists(os.path.join(dir_path, OUTPUT_FILE_NAME))):
+                return
+            for file_path in directory_info['unchanged']:
+                streams = cache.streams(file_path)
+                if streams is not None:
+                    files[os.path.basename(file_path)] = streams
+            if files:
+                write_directory_info(dir_path, files)
+
+    def collect(done):
+        nonlocal processed, failed, last_report
+        for future in done:
+            entry = pending.pop(future)
+            streams = future.result()
+            if streams is None:
+                failed += 1
+            else:
+                processed += 1
+                if cache:
+                    cache.store(entry, streams)
+                if report:
+                    report.add(entry.path, streams)
+            if not report:
+                add_to_directory(entry.path, streams, 1)
+        now = time.monotonic()
+        if now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            total = processed + failed
+            print(f"Processed {total} files ({failed} failed, {unchanged} unchanged), "
+                  f"{total / (now - start):.1f} files/s")
+
+    try:
+        with pool_class(max_workers=workers) as executor:
+            pending = {}
+            for entry in walk_media(directory, extensions):
+                dir_path = os.path.dirname(entry.path)
+                if not report and dir_path != walking:
+                    previous, walking = walking, dir_path
+                    directories[dir_path] = {'files': {}, 'names': set(), 'unchanged': [], 'outstanding': 0,
+                                             'probed': False}
+                    if previous is not None:
+                        write_if_complete(previous)
+                if not report:
+                    directories[dir_path]['names'].add(os.path.basename(entry.path))
+                if cache and cache.is_current(entry):
+                    unchanged += 1
+                    if report:
+                        report.add(entry.path, cache.streams(entry.path))
+                    else:
+                        directories[dir_path]['unchanged'].append(entry.path)
+                    continue
+                if len(pending) >= max_in_flight:
+                    collect(concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED).done)
+                pending[executor.submit(_safe_probe, probe, entry.path)] = entry
+                if not report:
+                    directories[dir_path]['outstanding'] += 1
+                    directories[dir_path]['probed'] = True
+            walking = None
+            collect(concurrent.futures.wait(pending).done)
+            for dir_path in list(directories):
+                write_if_complete(dir_path)
+            # Directories the walk never reached have no media files left
+            for dir_path in cached_files:
+                try:
+                    os.remove(os.path.join(dir_path, OUTPUT_FILE_NAME))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"Error removing {os.path.join(dir_path, OUTPUT_FILE_NAME)}: {str(e)}")
+        if cache:
+            cache.prune(extensions)
+    finally:
+        if cache:
+            cache.close()
+
+    elapsed = time.monotonic() - start
+    total = processed + failed
+    rate = total / elapsed if elapsed else 0.0
+    print(f"Finished {total} files ({failed} failed, {unchanged} unchanged) in {elapsed:.1f}s, {rate:.1f} files/s")
+    return processed, failed, unchanged
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write video and audio stream information for a media library.')
+    parser.add_argument('directory', help='the directory to scan')
+    parser.add_argument('-j', '--workers', type=int, default=8, help='number of files probed at the same time')
+    parser.add_argument('--processes', action='store_true', help='probe in worker processes instead of threads')
+    parser.add_argument('--max-in-flight', type=int, help='most files queued at once (default: 4 per worker)')
+    parser.add_argument('--no-cache', action='store_true', help='probe every file, ignoring the probe cache')
+    parser.add_argument('--report', help='write one report for the whole library to this file '
+                                         'instead of a text file per directory')
+    parser.add_argument('--format', choices=REPORT_FORMATS, help='report format (default: from the file extension)')
+    parser.add_argument('--fast', action='store_true', help='read only container headers where possible')
+    parser.add_argument('--extensions', help='comma-separated file extensions to process '
+                                             f'(default: {",".join(sorted(MEDIA_EXTENSIONS))})')
+    args = parser.parse_args()
+    extensions = MEDIA_EXTENSIONS
+    if args.extensions:
+        extensions = frozenset('.' + ext.strip().lstrip('.').lower() for ext in args.extensions.split(','))
+
+    if args.report:
+        with MediaReport(args.report, args.format) as report:
+            process_directory(args.directory, args.workers, args.processes, args.max_in_flight, not args.no_cache,
+                              report, args.fast, extensions)
+        print(f"Wrote {report.rows} stream records to {args.report}")
+    else:
+        process_directory(args.directory, args.workers, args.processes, args.max_in_flight, not args.no_cache,
+                          fast_probe=args.fast, extensions=extensions)
+
 
 if __name__ == "__main__":
-    directory = ""
-    process_directory(directory)
\ No newline at end of file
+    main()
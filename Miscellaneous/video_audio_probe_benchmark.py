@@ -0,0 +1,91 @@
+import argparse
+import io
+import statistics
+import time
+
+from video_audio_info import find_media_files, probe_file
+
+
+class CountingFile(io.RawIOBase):
+    """
+    Read-only file wrapper that counts the bytes read through it.
+
+    PyAV reads through this object when it is passed to `av.open`, so
+    `bytes_read` is what the probe actually pulled from the disk or mount.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb', buffering=0)
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        read = self._file.readinto(buffer)
+        self.bytes_read += read or 0
+        return read
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def measure(file_path, fast):
+    with CountingFile(file_path) as file:
+        start = time.perf_counter()
+        streams = probe_file(file, fast)
+        return time.perf_counter() - start, file.bytes_read, streams
+
+
+def benchmark(directory, limit=None):
+    """
+    Compare bytes read and latency per file between full and fast probing.
+
+    Each file is probed in both modes. The fast mode runs first, so it doesn't
+    benefit from pages the full probe has just pulled into the cache.
+    """
+    results = {False: ([], []), True: ([], [])}
+    differences = 0
+    for count, file_path in enumerate(find_media_files(directory)):
+        if limit is not None and count >= limit:
+            break
+        streams = {}
+        for fast in (True, False):
+            elapsed, bytes_read, streams[fast] = measure(file_path, fast)
+            results[fast][0].append(elapsed)
+            results[fast][1].append(bytes_read)
+        differences += streams[True] != streams[False]
+
+    files = len(results[False][0])
+    if not files:
+        print("No media files found")
+        return
+
+    print(f"{files} files, {differences} where the fast probe differed from the full probe")
+    print(f"{'mode':>6} {'median ms':>10} {'mean ms':>9} {'median KiB':>11} {'mean KiB':>9}")
+    for fast, name in ((False, 'full'), (True, 'fast')):
+        latencies, byte_counts = results[fast]
+        print(f"{name:>6} {statistics.median(latencies) * 1000:>10.2f} {statistics.mean(latencies) * 1000:>9.2f} "
+              f"{statistics.median(byte_counts) / 1024:>11.1f} {statistics.mean(byte_counts) / 1024:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full against header-only media probing.')
+    parser.add_argument('directory', help='the directory with media files to probe')
+    parser.add_argument('-n', '--limit', type=int, help='probe at most this many files')
+    args = parser.parse_args()
+    benchmark(args.directory, args.limit)
+
+
+if __name__ == "__main__":
+    main()